@@ -4,9 +4,58 @@ Handles rotation and geodetic conversion using pymap3d.
 """
 
 import sys
+import math
 import pymap3d as pm
 import numpy as np
 
+# WGS84 ellipsoid constants
+_WGS84_A = 6378137.0
+_WGS84_F = 1.0 / 298.257223563
+_WGS84_B = _WGS84_A * (1.0 - _WGS84_F)
+_WGS84_E2 = _WGS84_F * (2.0 - _WGS84_F)
+_WGS84_EP2 = (_WGS84_A ** 2 - _WGS84_B ** 2) / _WGS84_B ** 2
+
+
+def _enu2geodetic_scalar(e, n, u, sin_phi, cos_phi, sin_lam, cos_lam,
+                         x0, y0, z0):
+    """
+    Convert a single ENU point to geodetic (WGS84) using math-module scalars.
+
+    Dedicated closed-form kernel (ENU -> ECEF -> Bowring's geodetic) that
+    avoids pymap3d's array handling and NumPy ufunc dispatch for the
+    scalar hot path. Matches pm.enu2geodetic to sub-millimeter.
+
+    The reference-point quantities are loop-invariant, so callers pass
+    them precomputed (CoordinateTransformer caches them at init): the
+    kernel itself runs no trig beyond the output Bowring step.
+
+    Args:
+        e, n, u: ENU offsets in meters
+        sin_phi, cos_phi: Sine/cosine of the reference latitude
+        sin_lam, cos_lam: Sine/cosine of the reference longitude
+        x0, y0, z0: ECEF coordinates of the reference point in meters
+
+    Returns:
+        Tuple of (latitude_deg, longitude_deg, altitude_m)
+    """
+    # Rotate ENU into the ECEF frame and translate
+    x = x0 - sin_lam * e - sin_phi * cos_lam * n + cos_phi * cos_lam * u
+    y = y0 + cos_lam * e - sin_phi * sin_lam * n + cos_phi * sin_lam * u
+    z = z0 + cos_phi * n + sin_phi * u
+
+    # Bowring's closed-form ECEF -> geodetic
+    p = math.hypot(x, y)
+    theta = math.atan2(z * _WGS84_A, p * _WGS84_B)
+    sin_t, cos_t = math.sin(theta), math.cos(theta)
+    lat = math.atan2(z + _WGS84_EP2 * _WGS84_B * sin_t ** 3,
+                     p - _WGS84_E2 * _WGS84_A * cos_t ** 3)
+    lon = math.atan2(y, x)
+    sin_lat = math.sin(lat)
+    n_lat = _WGS84_A / math.sqrt(1.0 - _WGS84_E2 * sin_lat * sin_lat)
+    alt = p / math.cos(lat) - n_lat
+
+    return math.degrees(lat), math.degrees(lon), alt
+
 
 class CoordinateTransformer:
     """Transform local XY coordinates to GPS coordinates."""
@@ -26,10 +75,46 @@ class CoordinateTransformer:
         self.home_alt = home_alt
         self.rotation_deg = rotation_deg
 
-        # Pre-calculate rotation matrix
-        rad = np.radians(rotation_deg)
-        self.cos_r = np.cos(rad)
-        self.sin_r = np.sin(rad)
+        # Pre-calculate rotation matrix (math module: plain C scalars,
+        # no NumPy ufunc dispatch for a one-off scalar computation);
+        # zero rotation gets exact identity constants without any trig
+        self._rot_identity = (rotation_deg == 0.0)
+        if self._rot_identity:
+            self.cos_r, self.sin_r = 1.0, 0.0
+        else:
+            rad = math.radians(rotation_deg)
+            self.cos_r = math.cos(rad)
+            self.sin_r = math.sin(rad)
+        self.R = np.array([[self.cos_r, -self.sin_r],
+                           [self.sin_r, self.cos_r]])
+
+        # Reference-point constants for the scalar geodetic kernel:
+        # sines/cosines of home lat/lon and the home ECEF position are
+        # loop-invariant, so they are computed once here instead of on
+        # every local_to_gps call
+        lam = math.radians(home_lon)
+        ref_phi = math.radians(home_lat)
+        self._sin_phi = math.sin(ref_phi)
+        self._cos_phi = math.cos(ref_phi)
+        self._sin_lam = math.sin(lam)
+        self._cos_lam = math.cos(lam)
+        n0 = _WGS84_A / math.sqrt(1.0 - _WGS84_E2 * self._sin_phi ** 2)
+        self._origin_ecef = (
+            (n0 + home_alt) * self._cos_phi * self._cos_lam,
+            (n0 + home_alt) * self._cos_phi * self._sin_lam,
+            (n0 * (1.0 - _WGS84_E2) + home_alt) * self._sin_phi,
+        )
+
+        # Degree scales at the home latitude for the equirectangular
+        # fast path: meridian and prime-vertical radii of curvature of
+        # the WGS84 ellipsoid, converted to meters per degree
+        phi = math.radians(home_lat)
+        sin_phi = math.sin(phi)
+        w2 = 1.0 - _WGS84_E2 * sin_phi * sin_phi
+        m_radius = _WGS84_A * (1.0 - _WGS84_E2) / w2 ** 1.5
+        n_radius = _WGS84_A / math.sqrt(w2)
+        self._m_per_deg_lat = math.radians(m_radius)
+        self._m_per_deg_lon = math.radians(n_radius * math.cos(phi))
 
     def local_to_gps(self, x, y, altitude):
         """
@@ -43,23 +128,31 @@ class CoordinateTransformer:
         Returns:
             Tuple of (latitude, longitude, altitude_msl)
         """
-        # Apply rotation if specified
-        if self.rotation_deg != 0:
-            rotated_x = x * self.cos_r - y * self.sin_r
-            rotated_y = x * self.sin_r + y * self.cos_r
+        # Apply precomputed rotation matrix (identity fast path skips it)
+        if self._rot_identity:
+            rotated_x, rotated_y = x, y
         else:
-            rotated_x = x
-            rotated_y = y
-
-        # Convert ENU to geodetic (WGS84)
-        lat, lon, alt_msl = pm.enu2geodetic(
-            e=rotated_x,
-            n=rotated_y,
-            u=altitude,
-            lat0=self.home_lat,
-            lon0=self.home_lon,
-            h0=self.home_alt
-        )
+            rotated_x, rotated_y = self.R @ (x, y)
+
+        # Convert ENU to geodetic (WGS84); scalar inputs use the direct
+        # closed-form kernel, arrays go through the vectorized pymap3d path
+        if isinstance(rotated_x, np.ndarray):
+            lat, lon, alt_msl = pm.enu2geodetic(
+                e=rotated_x,
+                n=rotated_y,
+                u=altitude,
+                lat0=self.home_lat,
+                lon0=self.home_lon,
+                h0=self.home_alt
+            )
+        else:
+            x0, y0, z0 = self._origin_ecef
+            lat, lon, alt_msl = _enu2geodetic_scalar(
+                rotated_x, rotated_y, altitude,
+                self._sin_phi, self._cos_phi,
+                self._sin_lam, self._cos_lam,
+                x0, y0, z0
+            )
 
         # Return altitude relative to home for mission planning
         # (since MAV_FRAME_GLOBAL_RELATIVE_ALT expects relative altitude)
@@ -67,23 +160,126 @@ class CoordinateTransformer:
 
         return lat, lon, alt_relative
 
+    def local_to_gps_batch(self, x, y, altitudes):
+        """
+        Convert arrays of local XY coordinates to GPS in one call.
+
+        Args:
+            x: (N,) array of east coordinates in meters
+            y: (N,) array of north coordinates in meters
+            altitudes: (N,) array of altitudes in meters (relative to home)
+
+        Returns:
+            Tuple of (lats, lons, alts) arrays; altitudes are relative
+            to home, matching local_to_gps
+        """
+        pts = self._rotate_batch(np.column_stack([x, y]))
+        alts = np.asarray(altitudes, dtype=np.float64)
+
+        lat, lon, _ = pm.enu2geodetic(
+            e=pts[:, 0],
+            n=pts[:, 1],
+            u=alts,
+            lat0=self.home_lat,
+            lon0=self.home_lon,
+            h0=self.home_alt
+        )
+        return lat, lon, alts
+
+    def enu_offset_to_gps(self, pts_xyz, offset_xy):
+        """
+        Apply a local offset and convert an (N, 3) array to GPS at once.
+
+        Fuses the home-margin translation with the batched rotation and
+        geodetic conversion so the waypoint array is traversed once,
+        with no per-point Python pass for the offset.
+
+        Args:
+            pts_xyz: (N, 3) array of local ENU waypoints in meters
+            offset_xy: (offset_east, offset_north) in meters
+
+        Returns:
+            Tuple of (lats, lons, alts) arrays; altitudes are relative
+            to home, matching local_to_gps
+        """
+        pts = np.asarray(pts_xyz, dtype=np.float64).reshape(-1, 3)
+        xy = self._rotate_batch(pts[:, :2] + offset_xy)
+
+        lat, lon, _ = pm.enu2geodetic(
+            e=xy[:, 0],
+            n=xy[:, 1],
+            u=pts[:, 2],
+            lat0=self.home_lat,
+            lon0=self.home_lon,
+            h0=self.home_alt
+        )
+        return lat, lon, pts[:, 2]
+
+    def local_to_gps_flat(self, x, y):
+        """
+        Convert local XY to GPS with the equirectangular approximation.
+
+        Skips the ECEF round-trip entirely: one meters-per-degree scale
+        per axis, precomputed at init from the WGS84 radii of curvature
+        at the home latitude. Accurate to centimeters at typical text
+        scales (hundreds of meters) and sub-meter out to about a
+        kilometer; callers should fall back to the full conversion for
+        larger extents.
+
+        Args:
+            x: East coordinate(s) in meters (scalar or array)
+            y: North coordinate(s) in meters (scalar or array)
+
+        Returns:
+            Tuple of (lat, lon), scalars or arrays matching the input
+        """
+        if self._rot_identity:
+            rx, ry = x, y
+        else:
+            rx = self.cos_r * x - self.sin_r * y
+            ry = self.sin_r * x + self.cos_r * y
+
+        lat = self.home_lat + ry / self._m_per_deg_lat
+        lon = self.home_lon + rx / self._m_per_deg_lon
+        return lat, lon
+
+    def _rotate_batch(self, xy):
+        """Rotate an (N, 2) array of XY points by the configured rotation."""
+        if self._rot_identity:
+            return xy
+        return xy @ self.R.T
+
     def path_to_gps(self, path, altitude):
         """
         Convert a path of XY points to GPS coordinates.
 
         Args:
-            path: List of (x, y) tuples in meters
+            path: List of (x, y) tuples or (N, 2) ndarray in meters
             altitude: Flight altitude in meters (relative to home)
 
         Returns:
             List of (lat, lon, alt) tuples
         """
-        gps_path = []
-        for x, y in path:
-            lat, lon, alt = self.local_to_gps(x, y, altitude)
-            gps_path.append((lat, lon, alt))
+        pts = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+        if pts.shape[0] == 0:
+            return []
 
-        return gps_path
+        # Apply rotation as a single matmul (skip for identity)
+        pts = self._rotate_batch(pts)
+
+        # pymap3d vectorizes over arrays, so one call converts the whole path
+        alts = np.full(pts.shape[0], altitude, dtype=np.float64)
+        lat, lon, _ = pm.enu2geodetic(
+            e=pts[:, 0],
+            n=pts[:, 1],
+            u=alts,
+            lat0=self.home_lat,
+            lon0=self.home_lon,
+            h0=self.home_alt
+        )
+
+        # Return altitude relative to home, matching local_to_gps
+        return list(zip(lat.tolist(), lon.tolist(), alts.tolist()))
 
     def get_bounds(self, paths):
         """
@@ -95,17 +291,28 @@ class CoordinateTransformer:
         Returns:
             Tuple of (min_x, max_x, min_y, max_y)
         """
-        all_points = []
+        # Single pass with running extrema per path: no concatenated copy
+        # of all points, just one vectorized min/max per path
+        min_x = min_y = float('inf')
+        max_x = max_y = float('-inf')
+        found = False
+
         for path in paths:
-            all_points.extend(path)
+            if len(path) == 0:
+                continue
+            pts = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+            mn = pts.min(axis=0)
+            mx = pts.max(axis=0)
+            min_x = min(min_x, mn[0])
+            min_y = min(min_y, mn[1])
+            max_x = max(max_x, mx[0])
+            max_y = max(max_y, mx[1])
+            found = True
 
-        if not all_points:
+        if not found:
             return (0, 0, 0, 0)
 
-        xs = [p[0] for p in all_points]
-        ys = [p[1] for p in all_points]
-
-        return (min(xs), max(xs), min(ys), max(ys))
+        return (min_x, max_x, min_y, max_y)
 
 
 
@@ -3,6 +3,8 @@ Hershey font stroke extraction module.
 Extracts single-stroke glyph paths from Hershey fonts.
 """
 
+from functools import lru_cache
+
 from HersheyFonts import HersheyFonts
 import numpy as np
 
@@ -23,6 +25,59 @@ class FontExtractor:
         self.font.normalize_rendering(letter_height_m)
         self.letter_height_m = letter_height_m
 
+        # Caches; font and height are fixed per extractor, so entries
+        # stay valid for its lifetime. _glyph_cache maps a character to
+        # its rendered segments at cursor 0 plus the cursor advance, so
+        # repeated characters across any texts render only once — it is
+        # naturally bounded by the glyph repertoire. The assembled
+        # per-text arrays go through a bounded per-instance lru_cache
+        # instead of a bare dict: long-lived extractors (the GUI server
+        # caches them across requests) would otherwise retain every
+        # text ever rendered
+        self._glyph_cache = {}
+        self._lines_array = lru_cache(maxsize=64)(self._assemble_lines)
+
+    def _glyph_lines(self, char):
+        """
+        Return (segments, advance) for one character, cached.
+
+        segments is the (N, 2, 2) float64 array the font renders for
+        the character alone; advance is the horizontal cursor movement,
+        matching what lines_for_text applies between characters.
+        """
+        entry = self._glyph_cache.get(char)
+        if entry is None:
+            lines = np.asarray(list(self.font.lines_for_text(char)),
+                               dtype=np.float64).reshape(-1, 2, 2)
+            opts = self.font.render_options
+            advance = sum((g.char_width + opts['spacing']) * opts['scalex']
+                          for g in self.font.glyphs_for_text(char))
+            entry = (lines, advance)
+            self._glyph_cache[char] = entry
+        return entry
+
+    def _assemble_lines(self, text):
+        """
+        Return the line segments for text as an (N, 2, 2) float64 array.
+
+        Assembled from per-character cached glyphs shifted by the
+        running cursor, so repeated characters ("HELLO", long banners)
+        skip the Hershey stroke extraction. Exposed as _lines_array,
+        which wraps this in a per-instance lru_cache so repeated
+        renders of recent texts skip the assembly too.
+        """
+        parts = []
+        x_cursor = 0.0
+        for char in text:
+            glyph_lines, advance = self._glyph_lines(char)
+            if len(glyph_lines):
+                shifted = glyph_lines.copy()
+                shifted[:, :, 0] += x_cursor
+                parts.append(shifted)
+            x_cursor += advance
+        return (np.concatenate(parts) if parts
+                else np.empty((0, 2, 2), dtype=np.float64))
+
     def extract_strokes(self, text):
         """
         Extract stroke paths for given text.
@@ -33,14 +88,9 @@ class FontExtractor:
         Returns:
             List of strokes, where each stroke is a list of (x, y) tuples
         """
-        strokes = []
-
-        # Get all line segments for the text
-        for (x1, y1), (x2, y2) in self.font.lines_for_text(text):
-            # Each line segment represents a stroke
-            strokes.append([(x1, y1), (x2, y2)])
-
-        return strokes
+        # Each line segment represents a stroke
+        return [[(x1, y1), (x2, y2)]
+                for (x1, y1), (x2, y2) in self._lines_array(text).tolist()]
 
     def extract_continuous_paths(self, text):
         """
@@ -53,32 +103,82 @@ class FontExtractor:
         Returns:
             List of continuous paths, where each path is a list of (x, y) points
         """
-        lines = list(self.font.lines_for_text(text))
-        if not lines:
-            return []
+        return list(self.iter_continuous_paths(text))
+
+    def iter_continuous_paths(self, text):
+        """
+        Yield continuous paths (pen-down segments) for text one at a
+        time.
+
+        Streaming form of extract_continuous_paths: callers that
+        process strokes independently (e.g. per-stroke simplification)
+        can consume each path and drop it without the full list ever
+        being materialized.
 
-        paths = []
+        Args:
+            text: Text string to convert
+
+        Yields:
+            Continuous paths, each a list of (x, y) points
+        """
+        lines = self._lines_array(text)
+        if lines.shape[0] == 0:
+            return
+
+        # Vectorized path: compute all segment gaps in one pass
+        if lines.shape[0] >= 8:
+            yield from self._split_connected_segments(lines)
+            return
+
+        lines = [((x1, y1), (x2, y2)) for (x1, y1), (x2, y2) in lines.tolist()]
         current_path = [lines[0][0], lines[0][1]]  # Start with first line
 
         for i in range(1, len(lines)):
             prev_end = lines[i-1][1]
             curr_start = lines[i][0]
 
-            # Check if current line connects to previous (within small tolerance)
-            distance = np.sqrt((curr_start[0] - prev_end[0])**2 +
-                             (curr_start[1] - prev_end[1])**2)
+            # Check if current line connects to previous (within small
+            # tolerance); compare squared distance against 0.1**2 = 0.01
+            # to avoid a sqrt per segment
+            distance_sq = ((curr_start[0] - prev_end[0])**2 +
+                           (curr_start[1] - prev_end[1])**2)
 
-            if distance < 0.1:  # Connected - continue path
+            if distance_sq < 0.01:  # Connected - continue path
                 current_path.append(lines[i][1])
             else:  # Disconnected - start new path
-                paths.append(current_path)
+                yield current_path
                 current_path = [lines[i][0], lines[i][1]]
 
-        # Add the last path
+        # Yield the last path
         if current_path:
-            paths.append(current_path)
+            yield current_path
 
-        return paths
+    def _split_connected_segments(self, lines):
+        """
+        Group an (N, 2, 2) array of line segments into continuous paths.
+
+        Computes all start-to-end gaps in a single vectorized pass and
+        splits where the squared gap exceeds the connectivity tolerance
+        (0.1m, compared as 0.01 to skip the sqrt).
+
+        Args:
+            lines: (N, 2, 2) float64 array of [[x1, y1], [x2, y2]] segments
+
+        Yields:
+            Continuous paths, where each path is a list of (x, y) points
+        """
+        ends = lines[:-1, 1]
+        starts = lines[1:, 0]
+        gap2 = (starts[:, 0] - ends[:, 0])**2 + (starts[:, 1] - ends[:, 1])**2
+
+        # Indices where a new path begins (first segment of each group)
+        breaks = np.flatnonzero(gap2 >= 0.01) + 1
+
+        for group in np.split(lines, breaks):
+            # A group of K connected segments yields K+1 points:
+            # the first segment's start plus every segment's end
+            pts = np.vstack((group[:1, 0], group[:, 1]))
+            yield [tuple(p) for p in pts.tolist()]
 
     def get_available_fonts(self):
         """Return list of available Hershey font names."""
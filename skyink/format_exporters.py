@@ -10,13 +10,32 @@ Supports exporting waypoints to various formats:
 """
 
 import os
+import io
 import csv
 import json
+import numpy as np
 from datetime import datetime
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape
 from skyink.mission_generator import MissionGenerator
 
+try:
+    import orjson  # optional fast JSON encoder
+except ImportError:
+    orjson = None
+
+# Per-waypoint KML placemark template (formatted once per waypoint)
+_KML_WP_TEMPLATE = """\
+    <Placemark>
+      <name>WP{i}</name>
+      <description>Waypoint {i}
+Alt: {alt:.1f}m</description>
+      <styleUrl>#waypointStyle</styleUrl>
+      <Point>
+        <coordinates>{lon},{lat},{alt}</coordinates>
+      </Point>
+    </Placemark>
+"""
+
 
 class FormatExporter:
     """Base class for format exporters"""
@@ -31,6 +50,10 @@ class FormatExporter:
             metadata: Dict with optional metadata (text, font, etc.)
         """
         self.waypoints = waypoints
+        # Contiguous (N, 3) view shared by every format; exporters that
+        # batch-format coordinates read this instead of re-walking the
+        # list of tuples
+        self.wps = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
         self.home_lat, self.home_lon, self.home_alt = home_position
         self.metadata = metadata or {}
 
@@ -52,87 +75,91 @@ class KMLExporter(FormatExporter):
         Returns:
             Path to created file
         """
-        # Create KML structure
-        kml = ET.Element('kml', xmlns='http://www.opengis.net/kml/2.2')
-        document = ET.SubElement(kml, 'Document')
-
-        # Add metadata
-        name = ET.SubElement(document, 'name')
-        name.text = self.metadata.get('text', 'Drone Mission')
-
-        description = ET.SubElement(document, 'description')
-        desc_text = f"Text-to-Drone Mission\n"
-        desc_text += f"Text: {self.metadata.get('text', 'N/A')}\n"
-        desc_text += f"Waypoints: {len(self.waypoints)}\n"
-        desc_text += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        description.text = desc_text
-
-        # Define styles
-        # Home marker style
-        home_style = ET.SubElement(document, 'Style', id='homeStyle')
-        icon_style = ET.SubElement(home_style, 'IconStyle')
-        icon = ET.SubElement(icon_style, 'Icon')
-        href = ET.SubElement(icon, 'href')
-        href.text = 'http://maps.google.com/mapfiles/kml/paddle/grn-circle.png'
-
-        # Waypoint marker style
-        wp_style = ET.SubElement(document, 'Style', id='waypointStyle')
-        icon_style = ET.SubElement(wp_style, 'IconStyle')
-        icon = ET.SubElement(icon_style, 'Icon')
-        href = ET.SubElement(icon, 'href')
-        href.text = 'http://maps.google.com/mapfiles/kml/paddle/blu-circle.png'
-
-        # Path line style
-        line_style = ET.SubElement(document, 'Style', id='pathStyle')
-        line_style_elem = ET.SubElement(line_style, 'LineStyle')
-        color = ET.SubElement(line_style_elem, 'color')
-        color.text = 'ff0000ff'  # Red in ABGR
-        width = ET.SubElement(line_style_elem, 'width')
-        width.text = '3'
-
-        # Add home position
-        home_placemark = ET.SubElement(document, 'Placemark')
-        home_name = ET.SubElement(home_placemark, 'name')
-        home_name.text = 'Home Position'
-        home_styleurl = ET.SubElement(home_placemark, 'styleUrl')
-        home_styleurl.text = '#homeStyle'
-        home_point = ET.SubElement(home_placemark, 'Point')
-        home_coords = ET.SubElement(home_point, 'coordinates')
-        home_coords.text = f"{self.home_lon},{self.home_lat},{self.home_alt}"
-
-        # Add waypoints as placemarks
-        for i, (lat, lon, alt) in enumerate(self.waypoints, 1):
-            placemark = ET.SubElement(document, 'Placemark')
-            pm_name = ET.SubElement(placemark, 'name')
-            pm_name.text = f'WP{i}'
-            pm_desc = ET.SubElement(placemark, 'description')
-            pm_desc.text = f'Waypoint {i}\nAlt: {alt:.1f}m'
-            pm_styleurl = ET.SubElement(placemark, 'styleUrl')
-            pm_styleurl.text = '#waypointStyle'
-            point = ET.SubElement(placemark, 'Point')
-            coords = ET.SubElement(point, 'coordinates')
-            coords.text = f"{lon},{lat},{alt}"
-
-        # Add path as LineString
-        path_placemark = ET.SubElement(document, 'Placemark')
-        path_name = ET.SubElement(path_placemark, 'name')
-        path_name.text = 'Flight Path'
-        path_styleurl = ET.SubElement(path_placemark, 'styleUrl')
-        path_styleurl.text = '#pathStyle'
-        linestring = ET.SubElement(path_placemark, 'LineString')
-        altitude_mode = ET.SubElement(linestring, 'altitudeMode')
-        altitude_mode.text = 'absolute'
-        coords = ET.SubElement(linestring, 'coordinates')
-        coords_text = '\n'.join([f"{lon},{lat},{alt}" for lat, lon, alt in self.waypoints])
-        coords.text = coords_text
-
-        # Pretty print and save
-        xml_str = minidom.parseString(ET.tostring(kml)).toprettyxml(indent='  ')
-        with open(filename, 'w') as f:
-            f.write(xml_str)
-
+        # Stream the document section by section to the open file; the
+        # per-waypoint placemarks go out through writelines of a
+        # generator, so no full-document string (MB-scale near the
+        # 500-waypoint cap) is ever held in memory. Building sections
+        # directly also avoids the per-waypoint ElementTree allocations
+        # and the full minidom re-parse that pretty-printing required
+        with open(filename, 'w', encoding='utf-8') as buf:
+            self._write_kml(buf)
         return filename
 
+    def _write_kml(self, buf):
+        """Write the KML document to an open text file handle."""
+        buf.write('<?xml version="1.0" ?>\n')
+        buf.write('<kml xmlns="http://www.opengis.net/kml/2.2">\n')
+        buf.write('  <Document>\n')
+
+        # Metadata; user-supplied text must be XML-escaped by hand now
+        # that ElementTree no longer builds the document
+        name = escape(str(self.metadata.get('text', 'Drone Mission')))
+        text = escape(str(self.metadata.get('text', 'N/A')))
+        buf.write(f"    <name>{name}</name>\n")
+        buf.write('    <description>Text-to-Drone Mission\n')
+        buf.write(f"Text: {text}\n")
+        buf.write(f"Waypoints: {len(self.waypoints)}\n")
+        buf.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</description>\n")
+
+        # Styles: home marker, waypoint marker, path line (red in ABGR)
+        buf.write("""\
+    <Style id="homeStyle">
+      <IconStyle>
+        <Icon>
+          <href>http://maps.google.com/mapfiles/kml/paddle/grn-circle.png</href>
+        </Icon>
+      </IconStyle>
+    </Style>
+    <Style id="waypointStyle">
+      <IconStyle>
+        <Icon>
+          <href>http://maps.google.com/mapfiles/kml/paddle/blu-circle.png</href>
+        </Icon>
+      </IconStyle>
+    </Style>
+    <Style id="pathStyle">
+      <LineStyle>
+        <color>ff0000ff</color>
+        <width>3</width>
+      </LineStyle>
+    </Style>
+""")
+
+        # Home position
+        buf.write(f"""\
+    <Placemark>
+      <name>Home Position</name>
+      <styleUrl>#homeStyle</styleUrl>
+      <Point>
+        <coordinates>{self.home_lon},{self.home_lat},{self.home_alt}</coordinates>
+      </Point>
+    </Placemark>
+""")
+
+        # Waypoint placemarks, one template format per waypoint,
+        # streamed without joining into an intermediate string
+        buf.writelines(_KML_WP_TEMPLATE.format(i=i, lat=lat, lon=lon, alt=alt)
+                       for i, (lat, lon, alt) in enumerate(self.wps.tolist(), 1))
+
+        # Path as LineString; np.savetxt formats the whole coordinate
+        # block in one C-level loop (lon,lat at 1e-7 deg, alt in cm,
+        # matching the CSV exporter's precision)
+        coords_buf = io.StringIO()
+        np.savetxt(coords_buf, self.wps[:, [1, 0, 2]], fmt='%.7f,%.7f,%.2f')
+        coords_text = coords_buf.getvalue().rstrip('\n')
+        buf.write(f"""\
+    <Placemark>
+      <name>Flight Path</name>
+      <styleUrl>#pathStyle</styleUrl>
+      <LineString>
+        <altitudeMode>absolute</altitudeMode>
+        <coordinates>{coords_text}</coordinates>
+      </LineString>
+    </Placemark>
+  </Document>
+</kml>
+""")
+
 
 class CSVExporter(FormatExporter):
     """Export waypoints to CSV format"""
@@ -147,7 +174,10 @@ class CSVExporter(FormatExporter):
         Returns:
             Path to created file
         """
-        with open(filename, 'w', newline='') as f:
+        # Stream rows straight to the file: csv.writer buffers through
+        # the file object, and the waypoint rows come from a generator,
+        # so no full-document string or row list is materialized
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
 
             # Header
@@ -162,15 +192,11 @@ class CSVExporter(FormatExporter):
                 'Home/Takeoff position'
             ])
 
-            # Waypoints
-            for i, (lat, lon, alt) in enumerate(self.waypoints, 1):
-                writer.writerow([
-                    f'WP{i}',
-                    f"{lat:.7f}",
-                    f"{lon:.7f}",
-                    f"{alt:.2f}",
-                    f'Waypoint {i}'
-                ])
+            # Waypoints, emitted in one writerows batch
+            writer.writerows(
+                [f'WP{i}', f"{lat:.7f}", f"{lon:.7f}", f"{alt:.2f}", f'Waypoint {i}']
+                for i, (lat, lon, alt) in enumerate(self.wps.tolist(), 1)
+            )
 
         return filename
 
@@ -201,29 +227,21 @@ class WaypointExporter(FormatExporter):
         Returns:
             Path to created file
         """
-        with open(filename, 'w') as f:
-            # Header: QGC WPL <VERSION>
+        # Format: INDEX CURRENT FRAME COMMAND PARAM1 PARAM2 PARAM3 PARAM4 PARAM5(X/LAT) PARAM6(Y/LON) PARAM7(Z/ALT) AUTOCONTINUE
+
+        # Header (QGC WPL <VERSION>) and home position (item 0), then
+        # waypoint lines streamed from a generator: current=0, frame=3
+        # (MAV_FRAME_GLOBAL_RELATIVE_ALT), command=16 (NAV_WAYPOINT),
+        # hold=0, pass-through=0, yaw=0, autocontinue=1; only index,
+        # position and acceptance radius vary
+        with open(filename, 'w', encoding='utf-8') as f:
             f.write('QGC WPL 110\n')
-
-            # Format: INDEX CURRENT FRAME COMMAND PARAM1 PARAM2 PARAM3 PARAM4 PARAM5(X/LAT) PARAM6(Y/LON) PARAM7(Z/ALT) AUTOCONTINUE
-
-            # Home position (item 0)
-            f.write(f'0\t1\t0\t16\t0\t0\t0\t0\t{self.home_lat:.7f}\t{self.home_lon:.7f}\t{self.home_alt:.2f}\t1\n')
-
-            # Waypoints
-            for i, (lat, lon, alt) in enumerate(self.waypoints, 1):
-                # MAV_CMD_NAV_WAYPOINT = 16
-                # FRAME: 3 = MAV_FRAME_GLOBAL_RELATIVE_ALT
-                current = 0  # Not current waypoint
-                frame = 3    # Global relative altitude
-                command = 16 # NAV_WAYPOINT
-                param1 = 0   # Hold time
-                param2 = self.acceptance_radius  # Acceptance radius
-                param3 = 0   # Pass through
-                param4 = 0   # Yaw
-                autocontinue = 1
-
-                f.write(f'{i}\t{current}\t{frame}\t{command}\t{param1}\t{param2}\t{param3}\t{param4}\t{lat:.7f}\t{lon:.7f}\t{alt:.2f}\t{autocontinue}\n')
+            f.write(f'0\t1\t0\t16\t0\t0\t0\t0\t{self.home_lat:.7f}\t'
+                    f'{self.home_lon:.7f}\t{self.home_alt:.2f}\t1\n')
+            f.writelines(
+                f'{i}\t0\t3\t16\t0\t{self.acceptance_radius}\t0\t0\t{lat:.7f}\t{lon:.7f}\t{alt:.2f}\t1\n'
+                for i, (lat, lon, alt) in enumerate(self.wps.tolist(), 1)
+            )
 
         return filename
 
@@ -241,13 +259,7 @@ class GeoJSONExporter(FormatExporter):
         Returns:
             Path to created file
         """
-        # Create GeoJSON structure
-        geojson = {
-            "type": "FeatureCollection",
-            "features": []
-        }
-
-        # Add home position
+        # Home position feature
         home_feature = {
             "type": "Feature",
             "properties": {
@@ -260,27 +272,14 @@ class GeoJSONExporter(FormatExporter):
                 "coordinates": [self.home_lon, self.home_lat, self.home_alt]
             }
         }
-        geojson["features"].append(home_feature)
-
-        # Add waypoints
-        for i, (lat, lon, alt) in enumerate(self.waypoints, 1):
-            feature = {
-                "type": "Feature",
-                "properties": {
-                    "name": f"WP{i}",
-                    "type": "waypoint",
-                    "index": i,
-                    "altitude": alt
-                },
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [lon, lat, alt]
-                }
-            }
-            geojson["features"].append(feature)
 
-        # Add path as LineString
-        path_coords = [[lon, lat, alt] for lat, lon, alt in self.waypoints]
+        # Path as LineString; reorder (lat, lon, alt) -> (lon, lat, alt)
+        # with one NumPy column swap. With orjson the ndarray goes to
+        # the encoder as-is (OPT_SERIALIZE_NUMPY walks it in C); only
+        # the stdlib fallback pays for the tolist conversion
+        # ascontiguousarray because orjson only accepts C-contiguous
+        # buffers and the fancy-index column swap may not produce one
+        path_coords = np.ascontiguousarray(self.wps[:, [1, 0, 2]])
         path_feature = {
             "type": "Feature",
             "properties": {
@@ -290,14 +289,44 @@ class GeoJSONExporter(FormatExporter):
             },
             "geometry": {
                 "type": "LineString",
-                "coordinates": path_coords
+                "coordinates": (path_coords if orjson is not None
+                                else path_coords.tolist())
             }
         }
-        geojson["features"].append(path_feature)
 
-        # Save to file
-        with open(filename, 'w') as f:
-            json.dump(geojson, f, indent=2)
+        # Assemble the full structure in one shot: home, waypoints, path
+        geojson = {
+            "type": "FeatureCollection",
+            "features": [home_feature] + [
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "name": f"WP{i}",
+                        "type": "waypoint",
+                        "index": i,
+                        "altitude": alt
+                    },
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [lon, lat, alt]
+                    }
+                }
+                for i, (lat, lon, alt) in enumerate(self.wps.tolist(), 1)
+            ] + [path_feature]
+        }
+
+        # orjson encodes the whole document in one C pass (fastest
+        # option, at the cost of one in-memory payload); the stdlib
+        # fallback streams through json.dump's incremental encoder
+        # instead of building the full string with dumps
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(
+                    geojson,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(geojson, f, indent=2)
 
         return filename
 
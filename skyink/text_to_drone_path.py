@@ -12,21 +12,193 @@ Usage:
     python text_to_drone_path.py "HELLO" --lat 47.397 --lon 8.545 --alt 488
 """
 
-import argparse
 import sys
-from skyink.font_extractor import FontExtractor
-from skyink.path_simplifier import PathSimplifier
-from skyink.coord_transformer import CoordinateTransformer
-from skyink.path_transitions import PathTransitionHandler
-from skyink.mission_generator import MissionGenerator
-from skyink.format_exporters import export_mission
+from functools import lru_cache
+
+# Pipeline stages (and their transitive numpy/pymap3d imports) are
+# imported inside the functions that use them, so --help and usage
+# errors return without loading any of the heavy stack
+
+
+@lru_cache(maxsize=128)
+def build_waypoints(text, font_name='futural', letter_height=20.0,
+                    simplify=True, epsilon=None, optimize=True,
+                    two_opt=False, flight_alt=30.0, transit_offset=10.0):
+    """
+    Run the extract/simplify/order/transition pipeline for a text.
+
+    Pure function of its arguments, so results are memoized: library
+    callers iterating parameters (animation frames, rotation sweeps —
+    rotation and home position are applied downstream and don't key the
+    cache) skip the whole chain on repeats.
+
+    Args:
+        text: Text string to convert
+        font_name: Hershey font name
+        letter_height: Letter height in meters
+        simplify: Apply Douglas-Peucker simplification
+        epsilon: Simplification tolerance (None = auto from height)
+        optimize: Reorder strokes to shorten transitions
+        two_opt: Polish the nearest-neighbor order with a 2-opt pass
+        flight_alt: Writing altitude in meters
+        transit_offset: Extra transit altitude in meters
+
+    Returns:
+        Tuple of (waypoints_3d, info): the (M, 3) waypoint array and a
+        dict of pipeline statistics for reporting
+    """
+    import numpy as np
+    from skyink.font_extractor import FontExtractor
+    from skyink.path_simplifier import PathSimplifier
+    from skyink.path_transitions import PathTransitionHandler
+
+    extractor = FontExtractor(font_name=font_name, letter_height_m=letter_height)
+
+    if simplify:
+        # Stream strokes through the simplifier: each original stroke
+        # is dropped as soon as its simplified form exists, so only one
+        # unsimplified stroke is alive at a time
+        simplifier = PathSimplifier(epsilon=epsilon, letter_height_m=letter_height)
+        original_points = 0
+        paths = []
+        for stroke in extractor.iter_continuous_paths(text):
+            original_points += len(stroke)
+            paths.append(simplifier.simplify_path(stroke))
+
+        info = {
+            'num_strokes': len(paths),
+            'original_points': original_points,
+            'simplified_points': sum(len(p) for p in paths),
+            'epsilon': simplifier.epsilon
+        }
+    else:
+        paths = extractor.extract_continuous_paths(text)
+        info = {
+            'num_strokes': len(paths),
+            'original_points': sum(len(p) for p in paths)
+        }
 
+    if not paths:
+        return np.empty((0, 3)), info
+
+    handler = PathTransitionHandler(
+        write_altitude_m=flight_alt,
+        transit_altitude_offset_m=transit_offset
+    )
+
+    if optimize:
+        info['transition_before'] = handler.calculate_transition_stats(
+            paths)['total_transition_distance']
+        paths, info['transition_after'] = handler.optimize_stroke_order(
+            paths, method='2opt' if two_opt else 'nearest_neighbor',
+            return_distance=True)
+
+    return handler.add_transitions(paths), info
+
+
+class _Args:
+    """Plain attribute holder for parsed command-line options."""
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+# Value-taking options: flag -> (attribute, type, default). A dict walk
+# of sys.argv replaces argparse, whose import and parser construction
+# dominate cold start for short texts (the CLI gets invoked per frame
+# by animation scripts)
+_VALUE_OPTS = {
+    '--lat': ('lat', float, None),
+    '--lon': ('lon', float, None),
+    '--alt': ('alt', float, 0.0),
+    '--rotation': ('rotation', float, 0.0),
+    '--font': ('font', str, 'futural'),
+    '--letter-height': ('letter_height', float, 20.0),
+    '--flight-alt': ('flight_alt', float, 30.0),
+    '--transit-offset': ('transit_offset', float, 10.0),
+    '--speed': ('speed', float, 3.0),
+    '--acceptance-radius': ('acceptance_radius', float, 1.5),
+    '--home-offset-x': ('home_offset_x', float, None),
+    '--home-offset-y': ('home_offset_y', float, None),
+    '--epsilon': ('epsilon', float, None),
+    '--continuous-threshold': ('continuous_threshold', float, None),
+    '--output': ('output', str, None),
+    '--format': ('format', str, 'plan'),
+}
+
+# Boolean flags: flag -> attribute
+_FLAG_OPTS = {
+    '--no-simplify': 'no_simplify',
+    '--no-optimize': 'no_optimize',
+    '--two-opt': 'two_opt',
+    '--direct-transitions': 'direct_transitions',
+    '--fast-coords': 'fast_coords',
+    '--no-takeoff': 'no_takeoff',
+    '--no-rtl': 'no_rtl',
+    '--verbose': 'verbose',
+}
+
+_SHORT_OPTS = {'-o': '--output', '-v': '--verbose'}
+
+_CHOICES = {
+    '--font': ('futural', 'futuram', 'scriptc', 'gothiceng',
+               'cursive', 'timesg', 'timesib', 'timesr'),
+    '--format': ('plan', 'kml', 'csv', 'waypoint', 'geojson'),
+}
+
+_REQUIRED = ('--lat', '--lon')
+
+_HELP = """usage: text_to_drone_path.py [-h] text --lat LAT --lon LON [options]
+
+Convert text to PX4 drone flight path (.plan file)
+
+positional arguments:
+  text                  Text to convert to drone path
+
+required arguments:
+  --lat LAT             Home latitude in degrees
+  --lon LON             Home longitude in degrees
+
+options:
+  -h, --help            show this help message and exit
+  --alt ALT             Home altitude in meters MSL (default: 0)
+  --rotation ROTATION   Text rotation in degrees (0=north, default: 0)
+  --font FONT           Hershey font name: futural, futuram, scriptc,
+                        gothiceng, cursive, timesg, timesib, timesr
+                        (default: futural)
+  --letter-height M     Letter height in meters (default: 20)
+  --flight-alt M        Flight altitude in meters above home (default: 30)
+  --transit-offset M    Additional altitude during transitions in meters
+                        (default: 10)
+  --speed SPEED         Flight speed in m/s (default: 3.0)
+  --acceptance-radius M
+                        Waypoint acceptance radius in meters (default: 1.5)
+  --home-offset-x M     Home offset West of text in meters (default: 50% of
+                        letter height)
+  --home-offset-y M     Home offset South of text in meters (default: 50% of
+                        letter height)
+  --no-simplify         Disable path simplification
+  --epsilon EPSILON     Path simplification tolerance in meters (auto if not
+                        specified)
+  --no-optimize         Disable stroke order optimization
+  --two-opt             Polish stroke order with a 2-opt pass (shorter
+                        transitions, slower for many strokes)
+  --direct-transitions  Use direct transitions without altitude separation
+  --continuous-threshold M
+                        Connect strokes closer than this (meters) without
+                        altitude change (cursive). Default: 30% of letter
+                        height
+  --fast-coords         Use equirectangular GPS conversion (cm-accurate at
+                        text scale; falls back to full conversion beyond 5km
+                        extents)
+  -o, --output OUTPUT   Output filename (default: <text>.<format>)
+  --format FORMAT       Output format: plan, kml, csv, waypoint, geojson
+                        (default: plan)
+  --no-takeoff          Exclude takeoff command from mission (plan format
+                        only)
+  --no-rtl              Exclude RTL command from mission (plan format only)
+  -v, --verbose         Print detailed information
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Convert text to PX4 drone flight path (.plan file)',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
 Examples:
   Basic usage:
     python text_to_drone_path.py "HELLO" --lat 47.397 --lon 8.545
@@ -39,70 +211,80 @@ Examples:
 
   Rotated text (45 degrees from north):
     python text_to_drone_path.py "NORTH" --lat 47.397 --lon 8.545 --rotation 45
-        """
-    )
+"""
+
+
+def _parse_error(message):
+    print(f"text_to_drone_path.py: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
+def _parse_args(argv):
+    """
+    Parse command-line arguments with a single walk over argv.
+
+    Mirrors the previous argparse contract: same flags, defaults,
+    choices, required options, and exit codes (0 for --help, 2 for
+    usage errors).
+    """
+    values = {attr: default for attr, _, default in _VALUE_OPTS.values()}
+    values.update({attr: False for attr in _FLAG_OPTS.values()})
+    values['text'] = None
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(_HELP)
+            sys.exit(0)
+        # --option=value form: split on the first '=' like argparse
+        inline = None
+        if arg.startswith('--') and '=' in arg:
+            arg, inline = arg.split('=', 1)
+        arg = _SHORT_OPTS.get(arg, arg)
+        if arg in _FLAG_OPTS:
+            if inline is not None:
+                _parse_error(f"argument {arg}: ignored explicit argument "
+                             f"{inline!r}")
+            values[_FLAG_OPTS[arg]] = True
+        elif arg in _VALUE_OPTS:
+            attr, conv, _ = _VALUE_OPTS[arg]
+            if inline is not None:
+                raw = inline
+            elif i + 1 < len(argv):
+                raw = argv[i + 1]
+                i += 1
+            else:
+                _parse_error(f"argument {arg}: expected one argument")
+            try:
+                values[attr] = conv(raw)
+            except ValueError:
+                _parse_error(
+                    f"argument {arg}: invalid {conv.__name__} value: {raw!r}")
+            choices = _CHOICES.get(arg)
+            if choices and values[attr] not in choices:
+                _parse_error(
+                    f"argument {arg}: invalid choice: {raw!r} "
+                    f"(choose from {', '.join(choices)})")
+        elif arg.startswith('-') and arg != '-':
+            _parse_error(f"unrecognized argument: {arg}")
+        elif values['text'] is None:
+            values['text'] = arg
+        else:
+            _parse_error(f"unrecognized argument: {arg}")
+        i += 1
+
+    if values['text'] is None:
+        _parse_error("the following arguments are required: text")
+    for flag in _REQUIRED:
+        if values[_VALUE_OPTS[flag][0]] is None:
+            _parse_error(f"the following arguments are required: {flag}")
+
+    return _Args(values)
 
-    # Required arguments
-    parser.add_argument('text', type=str, help='Text to convert to drone path')
-    parser.add_argument('--lat', type=float, required=True,
-                       help='Home latitude in degrees')
-    parser.add_argument('--lon', type=float, required=True,
-                       help='Home longitude in degrees')
-
-    # Optional position arguments
-    parser.add_argument('--alt', type=float, default=0.0,
-                       help='Home altitude in meters MSL (default: 0)')
-    parser.add_argument('--rotation', type=float, default=0.0,
-                       help='Text rotation in degrees (0=north, default: 0)')
-
-    # Text rendering options
-    parser.add_argument('--font', type=str, default='futural',
-                       choices=['futural', 'futuram', 'scriptc', 'gothiceng',
-                               'cursive', 'timesg', 'timesib', 'timesr'],
-                       help='Hershey font name (default: futural)')
-    parser.add_argument('--letter-height', type=float, default=20.0,
-                       help='Letter height in meters (default: 20)')
-
-    # Flight parameters
-    parser.add_argument('--flight-alt', type=float, default=30.0,
-                       help='Flight altitude in meters above home (default: 30)')
-    parser.add_argument('--transit-offset', type=float, default=10.0,
-                       help='Additional altitude during transitions in meters (default: 10)')
-    parser.add_argument('--speed', type=float, default=3.0,
-                       help='Flight speed in m/s (default: 3.0)')
-    parser.add_argument('--acceptance-radius', type=float, default=1.5,
-                       help='Waypoint acceptance radius in meters (default: 1.5)')
-    parser.add_argument('--home-offset-x', type=float, default=None,
-                       help='Home offset West of text in meters (default: 50%% of letter height)')
-    parser.add_argument('--home-offset-y', type=float, default=None,
-                       help='Home offset South of text in meters (default: 50%% of letter height)')
-
-    # Path processing options
-    parser.add_argument('--no-simplify', action='store_true',
-                       help='Disable path simplification')
-    parser.add_argument('--epsilon', type=float, default=None,
-                       help='Path simplification tolerance in meters (auto if not specified)')
-    parser.add_argument('--no-optimize', action='store_true',
-                       help='Disable stroke order optimization')
-    parser.add_argument('--direct-transitions', action='store_true',
-                       help='Use direct transitions without altitude separation')
-    parser.add_argument('--continuous-threshold', type=float, default=None,
-                       help='Connect strokes closer than this (meters) without altitude change (cursive). Default: 30%% of letter height')
-
-    # Output options
-    parser.add_argument('-o', '--output', type=str, default=None,
-                       help='Output filename (default: <text>.<format>)')
-    parser.add_argument('--format', type=str, default='plan',
-                       choices=['plan', 'kml', 'csv', 'waypoint', 'geojson'],
-                       help='Output format (default: plan)')
-    parser.add_argument('--no-takeoff', action='store_true',
-                       help='Exclude takeoff command from mission (plan format only)')
-    parser.add_argument('--no-rtl', action='store_true',
-                       help='Exclude RTL command from mission (plan format only)')
-    parser.add_argument('-v', '--verbose', action='store_true',
-                       help='Print detailed information')
-
-    args = parser.parse_args()
+
+def main():
+    args = _parse_args(sys.argv[1:])
 
     # Set default output filename
     if args.output is None:
@@ -120,88 +302,58 @@ Examples:
         print(f"Rotation: {args.rotation}°")
         print()
 
-    # Step 1: Extract font strokes
+    # Steps 1-4: extract, simplify, order, and lift to 3D in one cached
+    # pipeline call; identical parameters (animation frames, parameter
+    # sweeps) reuse the previous result
     if args.verbose:
         print("[1/6] Extracting Hershey font strokes...")
 
-    extractor = FontExtractor(font_name=args.font, letter_height_m=args.letter_height)
-    paths = extractor.extract_continuous_paths(args.text)
+    waypoints_3d, info = build_waypoints(
+        args.text,
+        font_name=args.font,
+        letter_height=args.letter_height,
+        simplify=not args.no_simplify,
+        epsilon=args.epsilon,
+        optimize=not args.no_optimize,
+        two_opt=args.two_opt,
+        flight_alt=args.flight_alt,
+        transit_offset=args.transit_offset
+    )
 
     if args.verbose:
-        total_points = sum(len(p) for p in paths)
-        print(f"  Extracted {len(paths)} strokes with {total_points} points")
+        print(f"  Extracted {info['num_strokes']} strokes with {info['original_points']} points")
 
-    if not paths:
+    if info['num_strokes'] == 0:
         print(f"Error: No paths extracted for text '{args.text}'", file=sys.stderr)
         return 1
 
-    # Step 2: Simplify paths (optional)
-    if not args.no_simplify:
-        if args.verbose:
+    if args.verbose:
+        if not args.no_simplify:
             print("[2/6] Simplifying paths with Douglas-Peucker...")
-
-        simplifier = PathSimplifier(epsilon=args.epsilon, letter_height_m=args.letter_height)
-        simplified_paths = simplifier.simplify_paths(paths)
-
-        if args.verbose:
-            original_count = sum(len(p) for p in paths)
-            simplified_count = sum(len(p) for p in simplified_paths)
-            reduction = 100 * (1 - simplified_count / original_count)
-            print(f"  {original_count} -> {simplified_count} points ({reduction:.1f}% reduction)")
-            print(f"  Epsilon: {simplifier.epsilon:.3f}m")
-
-        paths = simplified_paths
-    else:
-        if args.verbose:
+            reduction = 100 * (1 - info['simplified_points'] / info['original_points'])
+            print(f"  {info['original_points']} -> {info['simplified_points']} points ({reduction:.1f}% reduction)")
+            print(f"  Epsilon: {info['epsilon']:.3f}m")
+        else:
             print("[2/6] Skipping path simplification")
 
-    # Step 3: Optimize stroke order (optional)
-    if not args.no_optimize:
-        if args.verbose:
+        if not args.no_optimize:
             print("[3/6] Optimizing stroke order...")
-
-        handler = PathTransitionHandler(
-            write_altitude_m=args.flight_alt,
-            transit_altitude_offset_m=args.transit_offset
-        )
-        stats_before = handler.calculate_transition_stats(paths)
-        paths = handler.optimize_stroke_order(paths, method='nearest_neighbor')
-        stats_after = handler.calculate_transition_stats(paths)
-
-        if args.verbose:
-            improvement = stats_before['total_transition_distance'] - stats_after['total_transition_distance']
-            print(f"  Transition distance: {stats_before['total_transition_distance']:.1f}m -> {stats_after['total_transition_distance']:.1f}m")
+            improvement = info['transition_before'] - info['transition_after']
+            print(f"  Transition distance: {info['transition_before']:.1f}m -> {info['transition_after']:.1f}m")
             print(f"  Improvement: {improvement:.1f}m")
-    else:
-        if args.verbose:
+        else:
             print("[3/6] Skipping stroke order optimization")
 
-    # Step 4: Add altitude transitions
-    if args.verbose:
         print("[4/6] Adding altitude transitions...")
-
-    handler = PathTransitionHandler(
-        write_altitude_m=args.flight_alt,
-        transit_altitude_offset_m=args.transit_offset
-    )
-
-    # Determine continuous threshold
-    # Direct transitions = connect all strokes (infinite threshold)
-    # Default = 30% of letter height (cursive within letters)
-    if args.direct_transitions:
-        continuous_threshold = float('inf')  # Connect everything
-    elif args.continuous_threshold is None:
-        continuous_threshold = args.letter_height * 0.3  # Default cursive
-    else:
-        continuous_threshold = args.continuous_threshold  # User specified
-
-    waypoints_3d = handler.add_transitions(paths, continuous_threshold=continuous_threshold)
-
-    if args.verbose:
         print(f"  Flight altitude: {args.flight_alt}m (constant)")
         print(f"  Total 3D waypoints: {len(waypoints_3d)}")
 
         # Calculate and display mission time estimate
+        from skyink.path_transitions import PathTransitionHandler
+        handler = PathTransitionHandler(
+            write_altitude_m=args.flight_alt,
+            transit_altitude_offset_m=args.transit_offset
+        )
         time_stats = handler.calculate_mission_time(waypoints_3d, flight_speed_m_s=args.speed)
         print(f"  Estimated mission time: {time_stats['total_time_formatted']} ({time_stats['total_distance_m']:.1f}m total distance)")
 
@@ -209,12 +361,13 @@ Examples:
     if args.verbose:
         print("[5/6] Converting to GPS coordinates...")
 
-    # Calculate bounds to offset text so home is at bottom-left (southwest)
-    all_xy = [(x, y) for x, y, z in waypoints_3d]
-    min_x = min(p[0] for p in all_xy)
-    min_y = min(p[1] for p in all_xy)
-    max_x = max(p[0] for p in all_xy)
-    max_y = max(p[1] for p in all_xy)
+    # Calculate bounds to offset text so home is at bottom-left
+    # (southwest): one min and one max reduction over the XY columns of
+    # the (M, 3) waypoint array, which also feeds the batched GPS
+    # conversion below
+    pts = waypoints_3d
+    min_x, min_y = pts[:, :2].min(axis=0)
+    max_x, max_y = pts[:, :2].max(axis=0)
 
     # Default margin: 50% of letter height (scales with text size)
     default_margin = args.letter_height * 0.5
@@ -230,6 +383,7 @@ Examples:
         print(f"  Applying offset: x+={offset_x:.1f}m, y+={offset_y:.1f}m")
         print(f"  Home will be {margin_x:.1f}m West and {margin_y:.1f}m South of text start")
 
+    from skyink.coord_transformer import CoordinateTransformer
     transformer = CoordinateTransformer(
         home_lat=args.lat,
         home_lon=args.lon,
@@ -237,11 +391,22 @@ Examples:
         rotation_deg=args.rotation
     )
 
-    gps_waypoints = []
-    for x, y, z in waypoints_3d:
-        # Apply offset before GPS conversion
-        lat, lon, alt = transformer.local_to_gps(x + offset_x, y + offset_y, z)
-        gps_waypoints.append((lat, lon, z))  # Use relative altitude
+    # Offset and GPS conversion run as one fused kernel over the array;
+    # --fast-coords swaps in the equirectangular approximation when the
+    # offset text stays within 5km of home (beyond that the flat-earth
+    # error grows past centimeter level, so fall back to full ECEF)
+    extent = max(abs(min_x + offset_x), abs(max_x + offset_x),
+                 abs(min_y + offset_y), abs(max_y + offset_y))
+    if args.fast_coords and extent <= 5000.0:
+        import numpy as np
+        lats_a, lons_a = transformer.local_to_gps_flat(
+            pts[:, 0] + offset_x, pts[:, 1] + offset_y)
+        alts = pts[:, 2]
+        lats, lons = np.asarray(lats_a), np.asarray(lons_a)
+    else:
+        lats, lons, alts = transformer.enu_offset_to_gps(pts, (offset_x, offset_y))
+    # Use relative altitude
+    gps_waypoints = list(zip(lats.tolist(), lons.tolist(), alts.tolist()))
 
     if args.verbose:
         print(f"  Converted {len(gps_waypoints)} waypoints to GPS")
@@ -250,6 +415,7 @@ Examples:
     if args.verbose:
         print("[6/6] Generating QGroundControl .plan file...")
 
+    from skyink.mission_generator import MissionGenerator
     generator = MissionGenerator(
         acceptance_radius_m=args.acceptance_radius,
         flight_speed_m_s=args.speed
@@ -286,6 +452,7 @@ Examples:
         )
     else:
         # Use format exporters
+        from skyink.format_exporters import export_mission
         output_path = export_mission(
             gps_waypoints,
             home_position,
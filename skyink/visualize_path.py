@@ -5,11 +5,14 @@ Shows the 2D layout of text paths before GPS conversion.
 """
 
 import sys
+
+import numpy as np
+
 from skyink.font_extractor import FontExtractor
 from skyink.path_simplifier import PathSimplifier
 
 
-def visualize_paths_ascii(paths, width=80, height=24):
+def visualize_paths_ascii(paths, width=80, height=24, bounds=None):
     """
     Create ASCII art visualization of paths.
 
@@ -17,21 +20,28 @@ def visualize_paths_ascii(paths, width=80, height=24):
         paths: List of paths to visualize
         width: Terminal width in characters
         height: Terminal height in characters
+        bounds: Optional (min_x, min_y, max_x, max_y) of the paths;
+            skips the bounds pass when provided (e.g. reusing the
+            bounds this function returned for a previous render, which
+            also keeps both renders on the same scale)
+
+    Returns:
+        The unpadded (min_x, min_y, max_x, max_y) bounds used
     """
     if not paths:
         print("No paths to visualize")
-        return
+        return None
 
-    # Find bounds
-    all_points = []
-    for path in paths:
-        all_points.extend(path)
+    path_arrays = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in paths]
 
-    xs = [p[0] for p in all_points]
-    ys = [p[1] for p in all_points]
-
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
+    if bounds is None:
+        # Find bounds with one reduction over all points
+        all_points = np.concatenate(path_arrays)
+        min_x, min_y = all_points.min(axis=0)
+        max_x, max_y = all_points.max(axis=0)
+    else:
+        min_x, min_y, max_x, max_y = bounds
+    raw_bounds = (min_x, min_y, max_x, max_y)
 
     # Add padding
     padding = 0.1
@@ -42,37 +52,48 @@ def visualize_paths_ascii(paths, width=80, height=24):
     min_y -= range_y * padding
     max_y += range_y * padding
 
-    # Create canvas
-    canvas = [[' ' for _ in range(width)] for _ in range(height)]
-
-    # Draw paths
-    for path_idx, path in enumerate(paths):
-        for i, (x, y) in enumerate(path):
-            # Convert to canvas coordinates
-            col = int((x - min_x) / (max_x - min_x) * (width - 1))
-            row = int((1 - (y - min_y) / (max_y - min_y)) * (height - 1))
-
-            # Clip to canvas
-            col = max(0, min(width - 1, col))
-            row = max(0, min(height - 1, row))
-
-            # Draw point
-            if i == 0:
-                canvas[row][col] = 'o'  # Start of stroke
-            else:
-                canvas[row][col] = '*'  # Path point
-
-    # Print canvas
-    print("+" + "-" * width + "+")
-    for row in canvas:
-        print("|" + "".join(row) + "|")
-    print("+" + "-" * width + "+")
+    # Create canvas as one flat byte buffer: a single contiguous
+    # height*width allocation that scatter writes and the final byte
+    # extraction scan linearly
+    canvas = np.full(height * width, ord(' '), dtype=np.uint8)
+
+    # Draw paths: each stroke scatters into the canvas with fancy
+    # indexing at flat offsets row*width+col — marking the start first
+    # so a later point on the same cell overwrites it, exactly like the
+    # old per-point loop
+    # Degenerate extents (single-column/row text) collapse onto one cell
+    span_x = (max_x - min_x) or 1.0
+    span_y = (max_y - min_y) or 1.0
+
+    for path in path_arrays:
+        cols = (path[:, 0] - min_x) / span_x * (width - 1)
+        rows = (1 - (path[:, 1] - min_y) / span_y) * (height - 1)
+
+        # Clip to canvas (truncation toward zero matches int())
+        cols = np.clip(cols.astype(np.intp), 0, width - 1)
+        rows = np.clip(rows.astype(np.intp), 0, height - 1)
+
+        flat = rows * width + cols
+        canvas[flat[0]] = ord('o')  # Start of stroke
+        canvas[flat[1:]] = ord('*')  # Path points
+
+    # Assemble the framed canvas as one string and write it with a
+    # single print: row slices of the flat buffer, no per-row I/O
+    border = "+" + "-" * width + "+"
+    body = canvas.tobytes()
+    lines = [border]
+    lines.extend("|" + body[r * width:(r + 1) * width].decode('ascii') + "|"
+                 for r in range(height))
+    lines.append(border)
+    print("\n".join(lines))
 
     # Print stats
     print(f"\nBounds: x=[{min_x:.1f}, {max_x:.1f}]m, y=[{min_y:.1f}, {max_y:.1f}]m")
     print(f"Strokes: {len(paths)}")
     print(f"Total points: {sum(len(p) for p in paths)}")
 
+    return raw_bounds
+
 
 def main():
     if len(sys.argv) < 2:
@@ -103,14 +124,17 @@ def main():
     paths = extractor.extract_continuous_paths(text)
 
     print(f"Original paths ({sum(len(p) for p in paths)} points):")
-    visualize_paths_ascii(paths)
+    bounds = visualize_paths_ascii(paths)
 
     # Show simplified version
     simplifier = PathSimplifier(letter_height_m=letter_height)
     simplified_paths = simplifier.simplify_paths(paths)
 
+    # Simplification keeps a subset of the points, so the original
+    # bounds still cover the simplified paths: reuse them to skip the
+    # second bounds pass and render both views at the same scale
     print(f"\nSimplified paths ({sum(len(p) for p in simplified_paths)} points):")
-    visualize_paths_ascii(simplified_paths)
+    visualize_paths_ascii(simplified_paths, bounds=bounds)
 
     reduction = 100 * (1 - sum(len(p) for p in simplified_paths) / sum(len(p) for p in paths))
     print(f"\nPath simplification: {reduction:.1f}% reduction")